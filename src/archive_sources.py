@@ -0,0 +1,57 @@
+import tarfile
+import zipfile
+
+from custom_rules import decode_source
+
+# Archive types that can be checked without extracting them
+ZIP_SUFFIXES = ('.zip', '.whl')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+# Separates the archive from the member in reported paths (archive!member)
+ARCHIVE_SEPARATOR = '!'
+
+class ArchiveError(Exception):
+    """An archive could not be read; the message says why."""
+
+def is_archive(path):
+    """Return True if the path names an archive the checker can read."""
+    return path.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+def iter_archive_members(archive_path):
+    """Yield (member name, raw bytes) for every .py file in the archive.
+
+    Members are read one at a time straight from the archive; tar files are
+    read as a stream, so compressed tarballs are decompressed only once.
+    """
+    if archive_path.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.endswith('.py'):
+                    yield info.filename, archive.read(info)
+    else:
+        with tarfile.open(archive_path, 'r|*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith('.py'):
+                    yield member.name, archive.extractfile(member).read()
+
+def read_archive_sources(archive_path, errors=None):
+    """Yield ('archive!member', source) for every .py file in the archive, one member at a time.
+
+    Members that cannot be decoded as Python source are left out and
+    recorded in errors (display path -> message) when it is given;
+    otherwise the decoding error is raised. An archive that is missing or
+    cannot be read raises ArchiveError.
+    """
+    try:
+        for member_name, data in iter_archive_members(archive_path):
+            display_path = f"{archive_path}{ARCHIVE_SEPARATOR}{member_name}"
+            try:
+                source = decode_source(data)
+            except (SyntaxError, UnicodeDecodeError) as e:
+                if errors is None:
+                    raise
+                errors[display_path] = f"cannot decode: {e}"
+                continue
+            yield display_path, source
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+        raise ArchiveError(f"cannot read archive: {e}") from e
@@ -0,0 +1,227 @@
+import asyncio
+import time
+
+from custom_rules import read_source, run_custom_checks
+from external_tools import (
+    autopep8_diff_command,
+    flake8_command,
+    parse_flake8_output,
+)
+from guardrails import FileSkipped
+from rule_overlap import merge_violations, plan_checks
+from suppression import build_suppression_index, load_suppression_index
+
+# Tools the runner knows how to launch
+ALL_TOOLS = ('custom', 'flake8', 'autopep8')
+
+# Maximum number of tool jobs (custom checks or subprocesses) running at once
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Per-tool timeouts in seconds (None means no timeout)
+DEFAULT_TIMEOUTS = {
+    'custom': 60,
+    'flake8': 60,
+    'autopep8': 60,
+}
+
+async def run_external_tool(command, timeout=None, input_data=None):
+    """Run an external command asynchronously and return its standard output.
+
+    input_data (bytes) is fed to the command's standard input. The process
+    is killed if it does not finish within the timeout, and
+    asyncio.TimeoutError is raised to the caller.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.DEVNULL if input_data is None else asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(input_data), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    return stdout.decode()
+
+async def run_flake8_async(file_path, timeout=None, extend_ignore=(), source=None):
+    """Run flake8 on the specified file without blocking the event loop.
+
+    When source is given it is piped to flake8 instead of reading the file.
+    """
+    if source is None:
+        output = await run_external_tool(flake8_command(file_path, extend_ignore), timeout)
+    else:
+        command = flake8_command(file_path, extend_ignore, stdin=True)
+        output = await run_external_tool(command, timeout, source.encode('utf-8'))
+    return parse_flake8_output(output)
+
+async def run_autopep8_async(file_path, timeout=None):
+    """Run autopep8 in diff mode on the specified file and return the diff.
+
+    The file is never modified here, so autopep8 can safely overlap with
+    the checks that read the same file.
+    """
+    return await run_external_tool(autopep8_diff_command(file_path), timeout)
+
+def _run_custom_checks_timed(file_path, codes, source=None):
+    """Run the custom checks and return the violations, per-rule timings and suppression index.
+
+    The source is read once and its suppression comments are indexed once,
+    then shared by every rule.
+    """
+    source = read_source(file_path, source)
+    suppressions = build_suppression_index(source)
+    timings = {}
+    violations = run_custom_checks(file_path, codes, timings, source, suppressions)
+    return violations, timings, suppressions
+
+async def run_custom_tool_async(file_path, executor=None, timeout=None, codes=None, details=None, source=None):
+    """Run the custom checks in an executor so they overlap with the subprocesses.
+
+    When a details dict is given, the per-rule timings and the suppression
+    index of the file are stored in it. On timeout the caller stops
+    waiting, but a worker thread that is already running the checks cannot
+    be interrupted and finishes in the background.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, _run_custom_checks_timed, file_path, codes, source)
+    violations, timings, suppressions = await asyncio.wait_for(future, timeout)
+    if details is not None:
+        details['rule_timings'] = timings
+        details['suppressions'] = suppressions
+    return violations
+
+async def _run_tool(name, make_coroutine, semaphore, timeout, result, default):
+    """Run one tool under the concurrency limit and store its outcome in the result."""
+    async with semaphore:
+        start_time = time.perf_counter()
+        try:
+            result[name] = await asyncio.wait_for(make_coroutine(), timeout)
+        except asyncio.TimeoutError:
+            result[name] = default
+            result['errors'][name] = f"timed out after {timeout} seconds"
+        except FileSkipped as e:
+            result[name] = default
+            result['skipped'] = str(e)
+        except Exception as e:
+            result[name] = default
+            result['errors'][name] = str(e)
+        result['timings'][name] = time.perf_counter() - start_time
+        result['spans'].append((name, start_time, result['timings'][name]))
+
+async def check_file_async(file_path, semaphore=None, timeouts=None, executor=None, tools=ALL_TOOLS, plan=None, source=None):
+    """Run the selected tools on one file concurrently and return the combined result.
+
+    The plan (see rule_overlap.plan_checks) decides which engine runs each
+    overlapping check; 'merged' holds both engines' violations without
+    cross-engine duplicates. When source is given the file is checked in
+    memory and autopep8, which needs a real file, is skipped. Suppression
+    comments apply to the flake8 results as well as to the custom rules.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY)
+    if plan is None:
+        plan = plan_checks(tools)
+    timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+    result = {
+        'file_path': file_path,
+        'custom': [],
+        'flake8': [],
+        'autopep8': '',
+        'merged': [],
+        'timings': {},
+        'rule_timings': {},
+        'errors': {},
+        'skipped': None,
+        'spans': [],  # (tool, start, duration) on the time.perf_counter clock
+    }
+
+    details = {}
+    jobs = []
+    if 'custom' in tools:
+        jobs.append(_run_tool(
+            'custom',
+            lambda: run_custom_tool_async(file_path, executor, codes=plan['custom_codes'], details=details, source=source),
+            semaphore, timeouts['custom'], result, [],
+        ))
+    if 'flake8' in tools:
+        jobs.append(_run_tool(
+            'flake8',
+            lambda: run_flake8_async(file_path, extend_ignore=plan['flake8_extend_ignore'], source=source),
+            semaphore, timeouts['flake8'], result, [],
+        ))
+    if 'autopep8' in tools and source is None:
+        jobs.append(_run_tool(
+            'autopep8',
+            lambda: run_autopep8_async(file_path),
+            semaphore, timeouts['autopep8'], result, '',
+        ))
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*jobs)
+    result['timings']['total'] = time.perf_counter() - start_time
+    result['rule_timings'] = details.get('rule_timings', {})
+    if result['flake8']:
+        suppressions = details.get('suppressions')
+        if suppressions is None:
+            # The custom checks did not run, so index the comments here
+            loop = asyncio.get_running_loop()
+            suppressions = await loop.run_in_executor(executor, load_suppression_index, file_path, source)
+        result['flake8'] = suppressions.filter(result['flake8'])
+    result['merged'] = merge_violations(result['custom'], result['flake8'])
+    return result
+
+async def iter_check_results(file_paths, max_concurrency=DEFAULT_MAX_CONCURRENCY, timeouts=None, executor=None, tools=ALL_TOOLS, plan=None, sources=None, streamed=()):
+    """Check many files concurrently, yielding each file's result as soon as it finishes.
+
+    Files that have an entry in sources (path -> source) are checked in
+    memory. streamed is an iterable of (path, source) pairs, such as the
+    members of an archive; it is read lazily, so at most max_concurrency of
+    its sources are held in memory at once.
+    """
+    sources = sources or {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+    if plan is None:
+        plan = plan_checks(tools)
+    pending = {
+        asyncio.ensure_future(check_file_async(file_path, semaphore, timeouts, executor, tools, plan, sources.get(file_path)))
+        for file_path in file_paths
+    }
+    loop = asyncio.get_running_loop()
+    stream = iter(streamed)
+    streaming = set()
+    exhausted = False
+    while True:
+        while not exhausted and len(streaming) < max_concurrency:
+            # Reading the next source may decompress an archive, so keep it off the event loop
+            item = await loop.run_in_executor(None, next, stream, None)
+            if item is None:
+                exhausted = True
+                break
+            file_path, source = item
+            task = asyncio.ensure_future(check_file_async(file_path, semaphore, timeouts, executor, tools, plan, source))
+            streaming.add(task)
+            pending.add(task)
+        if not pending:
+            return
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        streaming -= done
+        for task in done:
+            yield task.result()
+
+def run_checks_concurrently(file_paths, max_concurrency=DEFAULT_MAX_CONCURRENCY, timeouts=None, executor=None, tools=ALL_TOOLS, plan=None, on_result=None, sources=None, streamed=()):
+    """Synchronous entry point: check the files and return results in completion order.
+
+    If on_result is given it is called with each result as it arrives.
+    """
+    async def collect():
+        results = []
+        async for result in iter_check_results(file_paths, max_concurrency, timeouts, executor, tools, plan, sources, streamed):
+            if on_result is not None:
+                on_result(result)
+            results.append(result)
+        return results
+
+    return asyncio.run(collect())
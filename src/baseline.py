@@ -0,0 +1,80 @@
+import hashlib
+import os
+
+from custom_rules import read_lines
+from rule_overlap import canonical_code
+
+# First line of every baseline file
+BASELINE_HEADER = "# style-checker baseline v1"
+
+# Hex digits kept from each fingerprint (64 bits)
+FINGERPRINT_LENGTH = 16
+
+# Lines of context above and below a violation that go into its fingerprint
+CONTEXT_LINES = 1
+
+def normalize_line(line):
+    """Collapse whitespace so re-indenting a line does not change its fingerprint."""
+    return ' '.join(line.split())
+
+def baseline_root(baseline_path):
+    """Return the directory the paths in a baseline are relative to: the one holding the baseline file."""
+    return os.path.dirname(os.path.abspath(baseline_path))
+
+def normalize_path(file_path, root=None):
+    """Return the path relative to root (the working directory by default) with forward slashes."""
+    return os.path.relpath(os.path.abspath(file_path), root or os.getcwd()).replace(os.sep, '/')
+
+def fingerprint_violations(file_path, violations, lines=None, root=None):
+    """Return one fingerprint per violation, in the same order.
+
+    A fingerprint hashes the rule code, the file, the normalized content of
+    the flagged line and the lines around it, so it survives code moving up
+    or down. Identical violations in one file are told apart by how many
+    times the same content was seen before. The file is identified by its
+    path relative to root (see baseline_root), so a baseline matches from
+    any working directory.
+    """
+    if lines is None:
+        lines = read_lines(file_path)
+    path = normalize_path(file_path, root)
+    occurrences = {}
+    fingerprints = []
+    for violation in violations:
+        index = violation['line_number'] - 1
+        window = []
+        for line_index in range(index - CONTEXT_LINES, index + CONTEXT_LINES + 1):
+            if 0 <= line_index < len(lines):
+                window.append(normalize_line(lines[line_index]))
+            else:
+                window.append('')
+        identity = '\0'.join([canonical_code(violation.get('code')) or '', path, *window])
+        occurrence = occurrences.get(identity, 0)
+        occurrences[identity] = occurrence + 1
+        digest = hashlib.sha1(f"{identity}\0{occurrence}".encode('utf-8')).hexdigest()
+        fingerprints.append(digest[:FINGERPRINT_LENGTH])
+    return fingerprints
+
+def save_baseline(baseline_path, fingerprints):
+    """Write the fingerprints to a baseline file, sorted and one per line."""
+    with open(baseline_path, 'w') as file:
+        file.write(BASELINE_HEADER + '\n')
+        for fingerprint in sorted(set(fingerprints)):
+            file.write(fingerprint + '\n')
+
+def load_baseline(baseline_path):
+    """Load a baseline file into a set of fingerprints."""
+    with open(baseline_path, 'r') as file:
+        lines = file.read().splitlines()
+    if not lines or lines[0] != BASELINE_HEADER:
+        raise ValueError(f"'{baseline_path}' is not a style checker baseline file")
+    return frozenset(lines[1:])
+
+def filter_new_violations(file_path, violations, baseline, lines=None, root=None):
+    """Return only the violations whose fingerprint is not in the baseline."""
+    fingerprints = fingerprint_violations(file_path, violations, lines, root)
+    return [
+        violation
+        for violation, fingerprint in zip(violations, fingerprints)
+        if fingerprint not in baseline
+    ]
@@ -1,11 +1,32 @@
 import ast
+import io
 import re
+import time
+import tokenize
+
+def read_source(file_path, source=None):
+    """Return the in-memory source if given, otherwise read the file."""
+    if source is not None:
+        return source
+    with open(file_path, 'r') as file:
+        return file.read()
+
+def read_lines(file_path, source=None):
+    """Return the lines of the source, split the way file.readlines() splits them."""
+    if source is None:
+        with open(file_path, 'r') as file:
+            return file.readlines()
+    return io.StringIO(source, newline=None).readlines()
+
+def decode_source(data):
+    """Decode the bytes of a Python file using its encoding declaration (PEP 263)."""
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    return io.TextIOWrapper(io.BytesIO(data), encoding, newline=None).read()
 
 # Rule 1: Variable Naming (snake_case)
-def check_variable_naming(file_path):
+def check_variable_naming(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     for node in ast.walk(tree):
         if isinstance(node, ast.Assign):
@@ -21,10 +42,9 @@ def check_variable_naming(file_path):
     return violations
 
 # Rule 2: Function Naming (snake_case)
-def check_function_naming(file_path):
+def check_function_naming(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     for node in ast.walk(tree):
         if isinstance(node, ast.FunctionDef):
@@ -38,10 +58,9 @@ def check_function_naming(file_path):
     return violations
 
 # Rule 3: Class Naming (CapWords)
-def check_class_naming(file_path):
+def check_class_naming(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     for node in ast.walk(tree):
         if isinstance(node, ast.ClassDef):
@@ -55,10 +74,9 @@ def check_class_naming(file_path):
     return violations
 
 # Rule 4: Indentation (4 spaces)
-def check_indentation(file_path):
+def check_indentation(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+    lines = read_lines(file_path, source)
 
     for idx, line in enumerate(lines):
         if line.startswith(' '):
@@ -71,30 +89,27 @@ def check_indentation(file_path):
     return violations
 
 # Rule 5: Blank Lines Between Functions/Classes
-def check_blank_lines_between_functions(file_path):
+def check_blank_lines_between_functions(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    lines = read_lines(file_path, source)
+    tree = ast.parse(''.join(lines))
 
     for node in ast.walk(tree):
         if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
             if hasattr(node, 'lineno') and node.lineno > 1:
                 previous_line = node.lineno - 1
-                with open(file_path, 'r') as f:
-                    lines = f.readlines()
-                    if lines[previous_line - 1].strip() != "":
-                        violations.append({
-                            'line_number': node.lineno,
-                            'column_number': 0,
-                            'message': f"Function/Class '{node.name}' should be preceded by a blank line"
-                        })
+                if lines[previous_line - 1].strip() != "":
+                    violations.append({
+                        'line_number': node.lineno,
+                        'column_number': 0,
+                        'message': f"Function/Class '{node.name}' should be preceded by a blank line"
+                    })
     return violations
 
 # Rule 6: Docstrings for Functions/Classes
-def check_docstrings(file_path):
+def check_docstrings(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     for node in ast.walk(tree):
         if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
@@ -107,11 +122,10 @@ def check_docstrings(file_path):
     return violations
 
 # Rule 7: Max Line Length (79 characters)
-def check_line_length(file_path):
+def check_line_length(file_path, source=None):
     violations = []
     max_line_length = 79
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+    lines = read_lines(file_path, source)
 
     for idx, line in enumerate(lines):
         if len(line) > max_line_length:
@@ -123,26 +137,23 @@ def check_line_length(file_path):
     return violations
 
 # Rule 8: Imports Ordering
-def check_imports_order(file_path):
+def check_imports_order(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+    lines = read_lines(file_path, source)
 
     imports = []
-    for line in lines:
+    first_line_numbers = {}  # First line number of each distinct import
+    for line_idx, line in enumerate(lines):
         stripped_line = line.strip()  # Remove leading/trailing whitespace
         if stripped_line.startswith('import') or stripped_line.startswith('from'):
             imports.append(stripped_line)  # Store stripped lines for comparison
+            first_line_numbers.setdefault(stripped_line, line_idx + 1)
 
     # Check that imports are ordered correctly: standard, third-party, then local
     for idx, imp in enumerate(imports):
         if idx > 0 and imp < imports[idx - 1]:
-            # Find the line number of the import
-            line_number = None
-            for line_idx, line in enumerate(lines):
-                if line.strip() == imp:
-                    line_number = line_idx + 1
-                    break
+            # Look up the line number of the import instead of rescanning the file
+            line_number = first_line_numbers.get(imp)
 
             if line_number is not None:
                 violations.append({
@@ -154,10 +165,9 @@ def check_imports_order(file_path):
     return violations
 
 # Rule 9: Trailing Whitespace
-def check_trailing_whitespace(file_path):
+def check_trailing_whitespace(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+    lines = read_lines(file_path, source)
 
     for idx, line in enumerate(lines):
         if line.endswith(" \n") or line.endswith("\t\n"):
@@ -169,10 +179,9 @@ def check_trailing_whitespace(file_path):
     return violations
 
 # Rule 10: Multiple Statements Per Line
-def check_multiple_statements(file_path):
+def check_multiple_statements(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+    lines = read_lines(file_path, source)
 
     for idx, line in enumerate(lines):
         if ';' in line:
@@ -184,10 +193,9 @@ def check_multiple_statements(file_path):
     return violations
 
 # Rule 11: Comparison with `is`
-def check_comparison_is(file_path):
+def check_comparison_is(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     for node in ast.walk(tree):
         if isinstance(node, ast.Compare):
@@ -200,10 +208,9 @@ def check_comparison_is(file_path):
     return violations
 
 # Rule 12: Unnecessary Semicolons
-def check_semicolons(file_path):
+def check_semicolons(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+    lines = read_lines(file_path, source)
 
     for idx, line in enumerate(lines):
         if line.strip().endswith(';'):
@@ -215,10 +222,9 @@ def check_semicolons(file_path):
     return violations
 
 # Rule 13: Mutable Default Arguments
-def check_mutable_default_args(file_path):
+def check_mutable_default_args(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     for node in ast.walk(tree):
         if isinstance(node, ast.FunctionDef):
@@ -232,23 +238,21 @@ def check_mutable_default_args(file_path):
     return violations
 
 # Rule 14: File End Blank Line
-def check_end_blank_line(file_path):
+def check_end_blank_line(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-        if lines[-1].strip() != "":
-            violations.append({
-                'line_number': len(lines),
-                'column_number': 0,
-                'message': "File should end with a blank line"
-            })
+    lines = read_lines(file_path, source)
+    if lines[-1].strip() != "":
+        violations.append({
+            'line_number': len(lines),
+            'column_number': 0,
+            'message': "File should end with a blank line"
+        })
     return violations
 
 # Rule 15: Unused Imports
-def check_unused_imports(file_path):
+def check_unused_imports(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     # Track all imported names
     imported_names = set()
@@ -288,10 +292,9 @@ def check_unused_imports(file_path):
     return violations
 
 # Rule 16: Unused Variables
-def check_unused_variables(file_path):
+def check_unused_variables(file_path, source=None):
     violations = []
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
+    tree = ast.parse(read_source(file_path, source))
 
     # Track all variable assignments
     assigned_vars = set()
@@ -318,4 +321,52 @@ def check_unused_variables(file_path):
                         'column_number': target.col_offset,
                         'message': f"Unused variable: {target.id}"
                     })
-    return violations
\ No newline at end of file
+    return violations
+
+# All custom checks by rule code, in the order they are reported
+CUSTOM_CHECKS = {
+    'CS001': check_variable_naming,
+    'CS002': check_function_naming,
+    'CS003': check_class_naming,
+    'CS004': check_indentation,
+    'CS005': check_blank_lines_between_functions,
+    'CS006': check_docstrings,
+    'CS007': check_line_length,
+    'CS008': check_imports_order,
+    'CS009': check_trailing_whitespace,
+    'CS010': check_multiple_statements,
+    'CS011': check_comparison_is,
+    'CS012': check_semicolons,
+    'CS013': check_mutable_default_args,
+    'CS014': check_end_blank_line,
+    'CS015': check_unused_imports,
+    'CS016': check_unused_variables,
+}
+
+def run_custom_checks(file_path, codes=None, timings=None, source=None, suppressions=None):
+    """Run the custom checks on the specified file and return all violations.
+
+    Only the rules listed in codes are run when it is given. Every violation
+    is tagged with the code of the rule that reported it. When a timings
+    dict is passed, the time spent in each rule is stored in it by code.
+    When source is given it is checked instead of reading file_path.
+    With a suppression index (see suppression.py), rules suppressed for the
+    whole file are skipped and suppressed violations are dropped as they
+    are emitted.
+    """
+    violations = []
+    for code, check in CUSTOM_CHECKS.items():
+        if codes is not None and code not in codes:
+            continue
+        if suppressions is not None and suppressions.is_rule_fully_suppressed(code):
+            continue
+        start_time = time.perf_counter()
+        found = check(file_path, source)
+        if timings is not None:
+            timings[code] = time.perf_counter() - start_time
+        for violation in found:
+            if suppressions is not None and suppressions.is_suppressed(violation['line_number'], code):
+                continue
+            violation['code'] = code
+            violations.append(violation)
+    return violations
@@ -0,0 +1,293 @@
+import bisect
+import difflib
+from collections import Counter
+
+# Lines of unchanged context around each hunk
+DEFAULT_CONTEXT = 3
+
+# Maximum number of diff lines produced; the rest of a huge diff is cut off
+DEFAULT_MAX_DIFF_LINES = 10000
+
+# Maximum edit distance explored per region before the region is shown as one replacement
+DEFAULT_MAX_COST = 1000
+
+def _hash_lines(a, b):
+    """Map the lines of both sequences to small integers, so comparisons are int compares."""
+    ids = {}
+    return [ids.setdefault(line, len(ids)) for line in a], [ids.setdefault(line, len(ids)) for line in b]
+
+def _trim(a, b, region, matches):
+    """Match the common prefix and suffix of a region and return what is left of it."""
+    alo, ahi, blo, bhi = region
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        matches.append((alo, blo))
+        alo += 1
+        blo += 1
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        matches.append((ahi, bhi))
+    return alo, ahi, blo, bhi
+
+def _middle_snake(a, b, region, max_cost):
+    """Find the middle snake of a region (Myers 1986, linear space).
+
+    Returns the snake as (x, y, u, v) in absolute positions, or None if
+    the region needs more than about 2 * max_cost edits.
+    """
+    alo, ahi, blo, bhi = region
+    n, m = ahi - alo, bhi - blo
+    delta = n - m
+    odd = delta & 1
+    limit = min((n + m + 1) // 2, max_cost)
+    offset = limit + 1
+    forward = [0] * (2 * limit + 3)
+    backward = [0] * (2 * limit + 3)
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + backward[offset + delta - k] >= n:
+                return alo + start_x, blo + start_y, alo + x, blo + y
+        # The backward search runs over the reversed sequences; its diagonal k is delta - k forward
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return ahi - x, bhi - y, ahi - start_x, bhi - start_y
+    return None
+
+def _myers(a, b, region, matches, max_cost):
+    """Add the matching lines of a region found with the O(ND) Myers algorithm.
+
+    Regions are split at their middle snakes on an explicit stack. A
+    region that costs more than max_cost is left unmatched, so it shows up
+    as one replacement instead of taking quadratic time.
+    """
+    stack = [region]
+    while stack:
+        region = _trim(a, b, stack.pop(), matches)
+        alo, ahi, blo, bhi = region
+        if alo == ahi or blo == bhi:
+            continue
+        snake = _middle_snake(a, b, region, max_cost)
+        if snake is None:
+            continue
+        x, y, u, v = snake
+        matches.extend((x + step, y + step) for step in range(u - x))
+        stack.append((alo, x, blo, y))
+        stack.append((u, ahi, v, bhi))
+
+def _unique_anchors(a, b, region):
+    """Return the lines unique to both sides of a region that appear in the same order (LIS)."""
+    alo, ahi, blo, bhi = region
+    a_counts = Counter(a[alo:ahi])
+    b_positions = {}
+    for j in range(blo, bhi):
+        b_positions[b[j]] = None if b[j] in b_positions else j
+    candidates = [
+        (i, b_positions[a[i]]) for i in range(alo, ahi)
+        if a_counts[a[i]] == 1 and b_positions.get(a[i]) is not None
+    ]
+    # Longest increasing subsequence of the b positions, by patience sorting
+    tops = []
+    top_indexes = []
+    previous = [None] * len(candidates)
+    for index, (_, j) in enumerate(candidates):
+        pile = bisect.bisect_left(tops, j)
+        if pile == len(tops):
+            tops.append(j)
+            top_indexes.append(index)
+        else:
+            tops[pile] = j
+            top_indexes[pile] = index
+        previous[index] = top_indexes[pile - 1] if pile else None
+    anchors = []
+    index = top_indexes[-1] if top_indexes else None
+    while index is not None:
+        anchors.append(candidates[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+def _patience(a, b, region, matches, max_cost):
+    """Add the matching lines of a region found with patience diff.
+
+    Lines that occur once on each side anchor the diff; the gaps between
+    anchors are diffed the same way, and gaps without unique lines fall
+    back to Myers.
+    """
+    stack = [region]
+    while stack:
+        region = _trim(a, b, stack.pop(), matches)
+        alo, ahi, blo, bhi = region
+        if alo == ahi or blo == bhi:
+            continue
+        anchors = _unique_anchors(a, b, region)
+        if not anchors:
+            _myers(a, b, region, matches, max_cost)
+            continue
+        for i, j in anchors:
+            stack.append((alo, i, blo, j))
+            matches.append((i, j))
+            alo, blo = i + 1, j + 1
+        stack.append((alo, ahi, blo, bhi))
+
+def _opcodes_from_matches(matches, a_length, b_length):
+    """Turn matched line pairs into difflib-style (tag, i1, i2, j1, j2) opcodes."""
+    opcodes = []
+    i = j = 0
+    for match_i, match_j in sorted(matches) + [(a_length, b_length)]:
+        if i < match_i or j < match_j:
+            tag = 'replace' if i < match_i and j < match_j else 'delete' if i < match_i else 'insert'
+            opcodes.append((tag, i, match_i, j, match_j))
+        if match_i < a_length:
+            if opcodes and opcodes[-1][0] == 'equal':
+                opcodes[-1] = ('equal', opcodes[-1][1], match_i + 1, opcodes[-1][3], match_j + 1)
+            else:
+                opcodes.append(('equal', match_i, match_i + 1, match_j, match_j + 1))
+        i, j = match_i + 1, match_j + 1
+    return opcodes
+
+def myers_opcodes(a, b, max_cost=DEFAULT_MAX_COST):
+    """Diff two line lists with the Myers algorithm over hashed lines."""
+    a_ids, b_ids = _hash_lines(a, b)
+    matches = []
+    _myers(a_ids, b_ids, (0, len(a), 0, len(b)), matches, max_cost)
+    return _opcodes_from_matches(matches, len(a), len(b))
+
+def patience_opcodes(a, b, max_cost=DEFAULT_MAX_COST):
+    """Diff two line lists with patience diff over hashed lines."""
+    a_ids, b_ids = _hash_lines(a, b)
+    matches = []
+    _patience(a_ids, b_ids, (0, len(a), 0, len(b)), matches, max_cost)
+    return _opcodes_from_matches(matches, len(a), len(b))
+
+def difflib_opcodes(a, b, max_cost=None):
+    """Diff two line lists with difflib (the previous engine, kept for comparison)."""
+    return difflib.SequenceMatcher(None, a, b).get_opcodes()
+
+# Diff algorithms by name; each takes (a, b, max_cost) and returns opcodes
+DIFF_ALGORITHMS = {
+    'patience': patience_opcodes,
+    'myers': myers_opcodes,
+    'difflib': difflib_opcodes,
+}
+
+# Algorithm used when none is given
+DEFAULT_ALGORITHM = 'patience'
+
+def edit_opcodes(a_length, edits):
+    """Build opcodes straight from known edits, without diffing.
+
+    edits are sorted, non-overlapping (i1, i2, new_lines) replacements of
+    the lines a[i1:i2].
+    """
+    opcodes = []
+    i = j = 0
+    for i1, i2, new_lines in edits:
+        if i < i1:
+            opcodes.append(('equal', i, i1, j, j + i1 - i))
+            j += i1 - i
+        tag = 'replace' if i1 < i2 and new_lines else 'delete' if i1 < i2 else 'insert'
+        opcodes.append((tag, i1, i2, j, j + len(new_lines)))
+        i, j = i2, j + len(new_lines)
+    if i < a_length:
+        opcodes.append(('equal', i, a_length, j, j + a_length - i))
+    return opcodes
+
+def apply_edits(a, edits):
+    """Return the lines of a with the edits applied."""
+    b = []
+    i = 0
+    for i1, i2, new_lines in edits:
+        b.extend(a[i:i1])
+        b.extend(new_lines)
+        i = i2
+    b.extend(a[i:])
+    return b
+
+def _group_opcodes(opcodes, context):
+    """Yield groups of opcodes with up to context lines of equal lines around the changes."""
+    opcodes = list(opcodes) or [('equal', 0, 1, 0, 1)]
+    if opcodes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = opcodes[0]
+        opcodes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if opcodes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = opcodes[-1]
+        opcodes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+    group = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal' and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+def _format_range(start, stop):
+    """Format a hunk range the way unified diffs do ('start,length')."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+def _diff_lines(prefix, lines):
+    """Prefix diff lines, marking a last line without a newline as patch(1) expects."""
+    for line in lines:
+        yield prefix + line if line.endswith('\n') else f"{prefix}{line}\n\\ No newline at end of file\n"
+
+def format_unified(a, b, opcodes, fromfile='', tofile='', context=DEFAULT_CONTEXT, max_lines=DEFAULT_MAX_DIFF_LINES):
+    """Format opcodes as a unified diff (as difflib.unified_diff, plus 'No newline' markers).
+
+    At most max_lines lines are produced; a note replaces the rest.
+    """
+    output = []
+    for group in _group_opcodes(opcodes, context):
+        if not output:
+            output.append(f"--- {fromfile}\n")
+            output.append(f"+++ {tofile}\n")
+        first, last = group[0], group[-1]
+        output.append(f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@\n")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                output.extend(_diff_lines(' ', a[i1:i2]))
+                continue
+            output.extend(_diff_lines('-', a[i1:i2]))
+            output.extend(_diff_lines('+', b[j1:j2]))
+        if max_lines is not None and len(output) > max_lines:
+            output = output[:max_lines]
+            output.append(f"... diff truncated after {max_lines} lines\n")
+            break
+    return ''.join(output)
+
+def unified_diff(a, b, fromfile='', tofile='', context=DEFAULT_CONTEXT, algorithm=DEFAULT_ALGORITHM,
+                 max_lines=DEFAULT_MAX_DIFF_LINES, max_cost=DEFAULT_MAX_COST):
+    """Return the unified diff of two line lists as a string."""
+    opcodes = DIFF_ALGORITHMS[algorithm](a, b, max_cost)
+    return format_unified(a, b, opcodes, fromfile, tofile, context, max_lines)
+
+def unified_diff_from_edits(a, edits, fromfile='', tofile='', context=DEFAULT_CONTEXT, max_lines=DEFAULT_MAX_DIFF_LINES):
+    """Return the unified diff of known edits to a line list, without running a diff."""
+    return format_unified(a, apply_edits(a, edits), edit_opcodes(len(a), edits), fromfile, tofile, context, max_lines)
@@ -0,0 +1,254 @@
+import argparse
+import os
+import sysconfig
+import tempfile
+import time
+
+from custom_rules import decode_source, run_custom_checks
+from legacy_rules import LEGACY_CHECKS
+from parallel_engine import CustomRuleEngine
+from suppression import build_suppression_index
+from symbol_index import walk_python_files
+from synthetic_corpus import generate_module
+
+# Directory of the example files shipped with the repository
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+# Sizes (in lines) of the generated modules added to the corpus
+DEFAULT_SYNTHETIC_SIZES = (200, 2000)
+
+# Maximum number of candidate inputs tried while minimizing one difference
+DEFAULT_MAX_TESTS = 500
+
+# Result of a check that raised (a syntax error, for example) instead of reporting violations
+ERROR = ('error',)
+
+def normalize(violations):
+    """Return violations as a sorted list of (code, line, column, message) tuples."""
+    return sorted(
+        (violation['code'], violation['line_number'], violation['column_number'], violation['message'])
+        for violation in violations
+    )
+
+def legacy_check(file_path, source):
+    """Run every frozen pre-engine rule (legacy_rules.py) on its own, the way the rules were first written.
+
+    The legacy rules read their file from disk, so the source is written to
+    a temporary file first. Suppression comments are applied afterwards,
+    since the engines honour them and the legacy functions predate them.
+    """
+    violations = []
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, os.path.basename(file_path) or 'module.py')
+        with open(legacy_path, 'w', newline='') as file:
+            file.write(source)
+        try:
+            for code, check in LEGACY_CHECKS.items():
+                violations.extend({**violation, 'code': code} for violation in check(legacy_path))
+        except Exception:
+            return ERROR
+    return normalize(build_suppression_index(source).filter(violations))
+
+class FunctionEngine:
+    """An engine that checks one file at a time with a function returning normalized results."""
+
+    def __init__(self, check):
+        """Wrap check(file_path, source)."""
+        self.check = check
+
+    def check_all(self, sources):
+        """Check every source and return {file_path: normalized result}."""
+        return {file_path: self.check(file_path, source) for file_path, source in sources.items()}
+
+    def close(self):
+        """Nothing to release."""
+
+def run_custom_checks_engine(file_path, source):
+    """The combined rule runner used by the CLI (one source, one suppression index)."""
+    try:
+        return normalize(run_custom_checks(file_path, source=source, suppressions=build_suppression_index(source)))
+    except Exception:
+        return ERROR
+
+class PoolEngine:
+    """A CustomRuleEngine worker pool (thread or process mode) under test."""
+
+    def __init__(self, mode, max_workers=None):
+        """Start the worker pool."""
+        self.engine = CustomRuleEngine(max_workers, mode)
+
+    def _normalize_result(self, result):
+        if result['errors'] or result['skipped']:
+            return ERROR
+        return normalize(result['custom'])
+
+    def check(self, file_path, source):
+        """Check one source on the pool."""
+        return self._normalize_result(self.engine.check_file(file_path, source=source))
+
+    def check_all(self, sources):
+        """Check every source on the pool at once and return {file_path: normalized result}."""
+        file_paths = list(sources)
+        results = self.engine.check_files(file_paths, sources=sources)
+        return {file_path: self._normalize_result(result) for file_path, result in zip(file_paths, results)}
+
+    def close(self):
+        """Shut the worker pool down."""
+        self.engine.close()
+
+# Engines compared with the legacy functions, by name
+ENGINE_FACTORIES = {
+    'run_custom_checks': lambda: FunctionEngine(run_custom_checks_engine),
+    'thread': lambda: PoolEngine('thread'),
+    'process': lambda: PoolEngine('process'),
+}
+
+def ddmin(lines, fails, max_tests=DEFAULT_MAX_TESTS):
+    """Reduce a list of lines to a 1-minimal sublist for which fails() still holds (Zeller's ddmin).
+
+    fails is called at most max_tests times; the smallest failing input
+    found so far is returned when the budget runs out.
+    """
+    tested = {}
+
+    def test(candidate):
+        key = tuple(candidate)
+        if key not in tested:
+            if len(tested) >= max_tests:
+                return False
+            tested[key] = fails(candidate)
+        return tested[key]
+
+    granularity = 2
+    while len(lines) >= 2:
+        size = -(-len(lines) // granularity)
+        chunks = [lines[start:start + size] for start in range(0, len(lines), size)]
+        for chunk in chunks:
+            if test(chunk):
+                lines, granularity = chunk, 2
+                break
+        else:
+            for index in range(len(chunks)):
+                complement = [line for other, chunk in enumerate(chunks) if other != index for line in chunk]
+                if test(complement):
+                    lines, granularity = complement, max(granularity - 1, 2)
+                    break
+            else:
+                if granularity >= len(lines) or len(tested) >= max_tests:
+                    break
+                granularity = min(granularity * 2, len(lines))
+    return lines
+
+def minimize_difference(file_path, source, engine, max_tests=DEFAULT_MAX_TESTS):
+    """Return the smallest source (by lines) on which the engine and the legacy functions still differ."""
+    def differs(lines):
+        candidate = ''.join(lines)
+        return engine.check(file_path, candidate) != legacy_check(file_path, candidate)
+
+    return ''.join(ddmin(source.splitlines(keepends=True), differs, max_tests))
+
+def describe_difference(expected, actual, limit=5):
+    """Return lines describing how an engine's result differs from the legacy result."""
+    if expected == ERROR or actual == ERROR:
+        return [f"legacy: {'error' if expected == ERROR else f'{len(expected)} violations'}, "
+                f"engine: {'error' if actual == ERROR else f'{len(actual)} violations'}"]
+    missing = [violation for violation in expected if violation not in actual]
+    extra = [violation for violation in actual if violation not in expected]
+    lines = [f"missing {code} at {line}:{column}: {message}" for code, line, column, message in missing[:limit]]
+    lines.extend(f"extra {code} at {line}:{column}: {message}" for code, line, column, message in extra[:limit])
+    if len(missing) > limit or len(extra) > limit:
+        lines.append(f"... {len(missing)} missing and {len(extra)} extra in total")
+    return lines
+
+def load_corpus(paths=(), examples=True, synthetic_sizes=DEFAULT_SYNTHETIC_SIZES, stdlib_limit=0):
+    """Return {name: source} for the example files, generated modules, the given paths and the stdlib."""
+    directories = list(paths)
+    if examples:
+        directories.append(EXAMPLES_DIRECTORY)
+    file_paths = []
+    for path in directories:
+        file_paths.extend(sorted(walk_python_files(path)) if os.path.isdir(path) else [path])
+    if stdlib_limit:
+        file_paths.extend(sorted(walk_python_files(sysconfig.get_paths()['stdlib']))[:stdlib_limit])
+
+    corpus = {}
+    for file_path in file_paths:
+        with open(file_path, 'rb') as file:
+            try:
+                corpus[os.path.normpath(file_path)] = decode_source(file.read())
+            except (SyntaxError, UnicodeDecodeError):
+                continue  # Not a decodable Python file; nothing to compare
+    for size in synthetic_sizes:
+        corpus[f"synthetic_{size}.py"] = generate_module(size, seed=size)
+    return corpus
+
+def compare_engines(corpus, engines, max_tests=DEFAULT_MAX_TESTS):
+    """Check the corpus with the legacy functions and every engine, and compare the results.
+
+    Returns {'timings': {name: seconds}, 'differences': [...]} where each
+    difference holds the engine, file, expected and actual results and a
+    minimal reproducing source.
+    """
+    start_time = time.perf_counter()
+    expected = {file_path: legacy_check(file_path, source) for file_path, source in corpus.items()}
+    timings = {'legacy': time.perf_counter() - start_time}
+    differences = []
+    for name, engine in engines.items():
+        start_time = time.perf_counter()
+        actual = engine.check_all(corpus)
+        timings[name] = time.perf_counter() - start_time
+        for file_path, source in corpus.items():
+            if actual[file_path] != expected[file_path]:
+                differences.append({
+                    'engine': name,
+                    'file_path': file_path,
+                    'expected': expected[file_path],
+                    'actual': actual[file_path],
+                    'reproducer': minimize_difference(file_path, source, engine, max_tests),
+                })
+    return {'timings': timings, 'differences': differences}
+
+def equivalence_main(argv=None):
+    """Compare the engines with the legacy rule functions; return 1 if any result differs."""
+    parser = argparse.ArgumentParser(prog='style_checker.py equivalence', description="Check that the rule engines report exactly what the legacy check_* functions report.")
+    parser.add_argument('paths', nargs='*', help="extra files or directories to add to the corpus")
+    parser.add_argument('--no-examples', action='store_true', help="leave the examples/ directory out of the corpus")
+    parser.add_argument('--synthetic-sizes', type=int, nargs='*', default=list(DEFAULT_SYNTHETIC_SIZES), help="sizes in lines of the generated modules")
+    parser.add_argument('--stdlib', type=int, default=0, metavar='N', help="add the first N standard library modules")
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINE_FACTORIES), default=list(ENGINE_FACTORIES), help="engines to compare")
+    parser.add_argument('--max-tests', type=int, default=DEFAULT_MAX_TESTS, help="candidate inputs tried per minimized difference")
+    parser.add_argument('--repro-dir', metavar='DIR', help="write each minimal reproducing input to this directory")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.paths, not args.no_examples, args.synthetic_sizes, args.stdlib)
+    line_count = sum(source.count('\n') for source in corpus.values())
+    print(f"Corpus: {len(corpus)} files, {line_count} lines.")
+    engines = {name: ENGINE_FACTORIES[name]() for name in args.engines}
+    try:
+        comparison = compare_engines(corpus, engines, args.max_tests)
+    finally:
+        for engine in engines.values():
+            engine.close()
+
+    print("\nThroughput:")
+    legacy_time = comparison['timings']['legacy']
+    for name, elapsed in comparison['timings'].items():
+        rate = line_count / elapsed if elapsed else float('inf')
+        print(f"  {name}: {elapsed:.3f} seconds, {rate:.0f} lines/second, {legacy_time / elapsed if elapsed else float('inf'):.2f}x legacy")
+
+    differences = comparison['differences']
+    if args.repro_dir and differences:
+        os.makedirs(args.repro_dir, exist_ok=True)
+    for number, difference in enumerate(differences, 1):
+        print(f"\n{difference['engine']} differs from legacy on {difference['file_path']}:")
+        for line in describe_difference(difference['expected'], difference['actual']):
+            print(f"  {line}")
+        print("  Minimal reproducing input:")
+        for line in difference['reproducer'].splitlines():
+            print(f"    | {line}")
+        if args.repro_dir:
+            repro_path = os.path.join(args.repro_dir, f"repro_{number}_{difference['engine']}.py")
+            with open(repro_path, 'w') as file:
+                file.write(difference['reproducer'])
+    print(f"\n{len(differences)} differences found.")
+    return 1 if differences else 0
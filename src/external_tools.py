@@ -0,0 +1,59 @@
+import platform
+import re
+import subprocess
+
+# Flake8 output format: file_path:line_number:column_number:error_code message
+FLAKE8_LINE_PATTERN = re.compile(r"^(.*):(\d+):(\d+):\s*(\w+\d+)\s*(.*)$")
+
+def flake8_command(file_path, extend_ignore=(), stdin=False):
+    """Build the flake8 command line for the specified file.
+
+    With stdin=True flake8 reads the source from standard input and reports
+    it under file_path.
+    """
+    command = ['flake8']
+    if extend_ignore:
+        command.append('--extend-ignore=' + ','.join(extend_ignore))
+    if stdin:
+        command.extend(['--stdin-display-name', file_path, '-'])
+    else:
+        command.append(file_path)
+    return command
+
+def autopep8_diff_command(file_path):
+    """Build the autopep8 command line that prints a diff without touching the file."""
+    return ['autopep8', '--diff', file_path]
+
+def parse_flake8_line(line):
+    """Parse one line of flake8 output into a violation, or None if it does not match."""
+    match = FLAKE8_LINE_PATTERN.match(line)
+    if not match:
+        return None
+    file_part, line_number, column_number, error_code, message = match.groups()
+    return {
+        'file_path': file_part.strip(),
+        'line_number': int(line_number.strip()),
+        'column_number': int(column_number.strip()),
+        'message': f"{error_code} {message.strip()}",
+        'code': error_code,
+    }
+
+def parse_flake8_output(output):
+    """Parse the full flake8 output into a list of violations."""
+    violations = []
+    for line in output.splitlines():
+        violation = parse_flake8_line(line)
+        if violation is not None:
+            violations.append(violation)
+    return violations
+
+def tool_versions():
+    """Return the versions of Python and the external tools, for run records."""
+    versions = {'python': platform.python_version()}
+    for tool in ('flake8', 'autopep8'):
+        try:
+            result = subprocess.run([tool, '--version'], capture_output=True, text=True)
+            versions[tool] = result.stdout.strip().splitlines()[0] if result.stdout.strip() else 'unknown'
+        except OSError:
+            versions[tool] = 'not installed'
+    return versions
@@ -0,0 +1,85 @@
+import ast
+import io
+
+import pycodestyle
+import pyflakes.checker
+from flake8.defaults import NOQA_FILE, NOQA_INLINE_REGEXP
+from flake8.plugins.pyflakes import FLAKE8_PYFLAKES_CODES
+
+# flake8's default maximum line length
+MAX_LINE_LENGTH = 79
+
+class _CollectingReport(pycodestyle.BaseReport):
+    """A pycodestyle report that keeps the errors instead of printing them."""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.errors = []
+
+    def error(self, line_number, offset, text, check):
+        code = super().error(line_number, offset, text, check)
+        if code:
+            self.errors.append((line_number, offset + 1, code, text[5:]))
+        return code
+
+def _style_options():
+    """pycodestyle options matching flake8's defaults (its default ignore list included)."""
+    return pycodestyle.StyleGuide(quiet=True, max_line_length=MAX_LINE_LENGTH).options
+
+def _violation(file_path, line_number, column_number, code, text):
+    """Build a violation in the shape external_tools.parse_flake8_line returns."""
+    return {
+        'file_path': file_path,
+        'line_number': line_number,
+        'column_number': column_number,
+        'message': f"{code} {text}",
+        'code': code,
+    }
+
+def _syntax_error_violation(file_path, error):
+    """Report a source that does not parse as flake8's E999."""
+    return _violation(file_path, error.lineno or 1, (error.offset or 0) + 1, 'E999', f"{type(error).__name__}: {error.msg}")
+
+def _is_noqa(lines, line_number, code):
+    """Return True if flake8 would drop the code because of a '# noqa' comment on its line."""
+    if not 0 < line_number <= len(lines):
+        return False
+    match = NOQA_INLINE_REGEXP.search(lines[line_number - 1])
+    if match is None:
+        return False
+    codes = match.group('codes')
+    if not codes:
+        return True
+    return any(code.startswith(noqa_code) for noqa_code in codes.replace(',', ' ').split())
+
+def run_flake8_inprocess(file_path, source, extend_ignore=()):
+    """Run flake8's checkers (pycodestyle and pyflakes) on a source without starting flake8.
+
+    The codes, messages and 1-based columns are those flake8 prints,
+    '# noqa' comments are honoured, and a source that does not parse
+    yields a single E999, as in flake8.
+    Plugins beyond pycodestyle and pyflakes are not run.
+    """
+    lines = io.StringIO(source).readlines()
+    if any(NOQA_FILE.match(line) for line in lines):
+        return []  # '# flake8: noqa' skips the whole file
+    try:
+        tree = ast.parse(source, file_path)
+    except SyntaxError as e:
+        return [_syntax_error_violation(file_path, e)]
+
+    options = _style_options()
+    report = _CollectingReport(options)
+    pycodestyle.Checker(file_path, lines=lines, options=options, report=report).check_all()
+    found = list(report.errors)
+
+    checker = pyflakes.checker.Checker(tree, filename=file_path)
+    for message in checker.messages:
+        code = FLAKE8_PYFLAKES_CODES.get(type(message).__name__, 'F999')
+        found.append((message.lineno, getattr(message, 'col', 0) + 1, code, message.message % message.message_args))
+
+    return [
+        _violation(file_path, line_number, column_number, code, text)
+        for line_number, column_number, code, text in sorted(found)
+        if not any(code.startswith(prefix) for prefix in extend_ignore) and not _is_noqa(lines, line_number, code)
+    ]
@@ -0,0 +1,122 @@
+import os
+import subprocess
+
+from custom_rules import decode_source
+
+# Index modes of regular files (symlinks and submodules are skipped)
+REGULAR_FILE_MODES = ('100644', '100755')
+
+class GitError(Exception):
+    """The staged files could not be read (no repository, no git); the message says why."""
+
+class GitCatFileBatch:
+    """One long-running `git cat-file --batch` process that serves blob contents."""
+
+    def __init__(self, repo_root='.'):
+        """Start the git process for the repository."""
+        self.process = subprocess.Popen(
+            ['git', 'cat-file', '--batch'],
+            cwd=repo_root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read_blob(self, object_id):
+        """Return the raw bytes of the object with the given id."""
+        self.process.stdin.write(object_id.encode('ascii') + b'\n')
+        self.process.stdin.flush()
+        header = self.process.stdout.readline()
+        if not header or header.endswith(b' missing\n'):
+            raise KeyError(f"Object {object_id} not found in the repository")
+        _, _, size = header.split()
+        data = self.process.stdout.read(int(size))
+        self.process.stdout.read(1)  # Newline that terminates every object
+        return data
+
+    def close(self):
+        """Stop the git process."""
+        self.process.stdin.close()
+        self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def repository_root(cwd='.'):
+    """Return the top-level directory of the git repository containing cwd.
+
+    Raises GitError outside a repository or when git cannot be run.
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        )
+    except OSError as e:
+        raise GitError(f"cannot run git: {e}") from e
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"not a git repository: {os.path.abspath(cwd)}") from e
+    return result.stdout.strip()
+
+def repository_pathspecs(repo_root, paths, cwd='.'):
+    """Turn paths given relative to cwd into literal git pathspecs relative to the repository root."""
+    pathspecs = []
+    for path in paths:
+        relative_path = os.path.relpath(os.path.realpath(os.path.join(cwd, path)), repo_root)
+        if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+            raise GitError(f"'{path}' is outside the repository {repo_root}")
+        pathspecs.append(':(literal)' + relative_path.replace(os.sep, '/'))
+    return pathspecs
+
+def list_staged_python_blobs(repo_root, pathspecs=()):
+    """Return (repository path, blob id) for every added or modified staged .py file.
+
+    With pathspecs, only the staged files they match are listed.
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'diff', '--cached', '--raw', '-z', '--no-abbrev', '--no-renames', '--diff-filter=ACM', '--', *pathspecs],
+            cwd=repo_root, capture_output=True, check=True,
+        )
+    except OSError as e:
+        raise GitError(f"cannot run git: {e}") from e
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"cannot list the staged files: {os.fsdecode(e.stderr).strip()}") from e
+    fields = result.stdout.split(b'\0')
+    blobs = []
+    # Each entry is ':old_mode new_mode old_id new_id status' followed by the path
+    for info, path in zip(fields[0::2], fields[1::2]):
+        _, new_mode, _, new_id, _ = info.decode('ascii').split()
+        path = os.fsdecode(path)
+        if new_mode in REGULAR_FILE_MODES and path.endswith('.py'):
+            blobs.append((path, new_id))
+    return blobs
+
+def read_staged_sources(cwd='.', paths=(), errors=None):
+    """Return the staged content of every staged .py file, keyed by its path relative to cwd.
+
+    When paths (files or directories, relative to cwd) are given, only the
+    staged files under them are read. All blobs are streamed through a
+    single git cat-file process and decoded in memory; nothing is written
+    to disk. Files that cannot be decoded as Python source are left out and
+    recorded in errors (path -> message) when it is given; otherwise the
+    decoding error is raised.
+    """
+    repo_root = repository_root(cwd)
+    pathspecs = repository_pathspecs(repo_root, paths, cwd)
+    # git reports the resolved top level, so compare against the resolved cwd
+    real_cwd = os.path.realpath(cwd)
+    sources = {}
+    with GitCatFileBatch(repo_root) as cat_file:
+        for path, object_id in list_staged_python_blobs(repo_root, pathspecs):
+            display_path = os.path.relpath(os.path.join(repo_root, path), real_cwd)
+            try:
+                sources[display_path] = decode_source(cat_file.read_blob(object_id))
+            except (SyntaxError, UnicodeDecodeError) as e:
+                if errors is None:
+                    raise
+                errors[display_path] = f"cannot decode: {e}"
+    return sources
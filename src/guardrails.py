@@ -0,0 +1,284 @@
+import collections
+import contextlib
+import math
+import signal
+import sys
+import threading
+from concurrent.futures import Executor, Future, InvalidStateError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # Windows has no resource limits; only the watchdog applies there
+    resource = None
+
+# Default per-file limits applied in the worker processes
+DEFAULT_LIMITS = {
+    'wall_time': 30,          # seconds per file
+    'memory_mb': 2048,        # address space per worker process
+    'recursion_limit': 5000,  # Python frames per worker process
+}
+
+class FileSkipped(Exception):
+    """A file was skipped because it hit a resource limit; the message is the reason."""
+
+class FileTimeout(BaseException):
+    """Raised inside a worker when a file runs past its wall time.
+
+    It derives from BaseException so the broad 'except Exception' handlers
+    around the rules cannot swallow it.
+    """
+
+def apply_worker_limits(memory_mb=None, recursion_limit=None):
+    """Process pool initializer: cap the memory and recursion depth of the worker."""
+    if recursion_limit:
+        sys.setrecursionlimit(recursion_limit)
+    if memory_mb and resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = memory_mb * 1024 * 1024
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _raise_timeout(signum, frame):
+    raise FileTimeout()
+
+def _cpu_seconds_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+@contextlib.contextmanager
+def watchdog(seconds):
+    """Interrupt the block with FileTimeout after the given wall time.
+
+    The timer interrupts Python code between bytecodes. As a backstop for
+    work stuck inside C code (ast.parse on a huge file), the soft CPU limit
+    is set to twice the wall time, after which the kernel kills the worker.
+    """
+    use_timer = seconds and hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+    if not use_timer:
+        yield
+        return
+
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    if resource is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        cpu_limit = math.ceil(_cpu_seconds_used() + 2 * seconds) + 1
+        if hard == resource.RLIM_INFINITY or cpu_limit < hard:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, hard))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if resource is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def run_guarded(wall_time, function, *args):
+    """Run function(*args) in a worker under the wall time; limit hits raise FileSkipped."""
+    try:
+        with watchdog(wall_time):
+            return function(*args)
+    except FileTimeout:
+        raise FileSkipped(f"took longer than {wall_time} seconds")
+    except MemoryError:
+        raise FileSkipped("exceeded the memory limit")
+    except RecursionError:
+        raise FileSkipped("too deeply nested (recursion limit reached)")
+
+def _copy_outcome(source, target):
+    """Give the target future the result or exception of the finished source future."""
+    try:
+        error = source.exception()
+        if error is None:
+            target.set_result(source.result())
+        else:
+            target.set_exception(error)
+    except InvalidStateError:
+        pass  # The target was cancelled meanwhile
+
+class _GuardedFuture(Future):
+    """The future of a guarded task; cancelling it cancels the attempt while it is queued."""
+
+    def __init__(self):
+        super().__init__()
+        self.attempt = None  # The process pool future of the current attempt
+        self.cancelling = False
+
+    def cancel(self):
+        """Cancel the task unless a worker is already running it."""
+        self.cancelling = True
+        attempt = self.attempt
+        if attempt is not None and not attempt.cancel():
+            self.cancelling = False
+            return False  # Running in a worker, which cannot be interrupted
+        return super().cancel()
+
+class GuardedExecutor(Executor):
+    """A process pool that runs every task under the per-file limits.
+
+    If a worker dies (the kernel killed it for exceeding a limit, or it
+    crashed), the pool is rebuilt. The tasks that had been handed to its
+    workers are retried one at a time in a single-worker pool; the tasks
+    still queued never ran, so they go back to the new shared pool. Tasks
+    that only shared the pool with the culprit are not charged for its
+    death; a task that kills its worker while running alone is reported as
+    FileSkipped, so one pathological file does not stop the run. A task can
+    be cancelled until a worker starts it.
+    """
+
+    def __init__(self, max_workers=None, limits=None):
+        """Create the process pool with the limits applied to every worker."""
+        self.max_workers = max_workers
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._lock = threading.Lock()
+        self._pool = self._create_pool(max_workers)
+        self._attempts = {}    # Unfinished shared pool futures, with their pool
+        self._started = set()  # Futures that had been handed to a worker when their pool broke
+        self._isolation_pool = None
+        self._isolation_queue = collections.deque()
+        self._isolation_busy = False
+
+    def _create_pool(self, max_workers):
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=apply_worker_limits,
+            initargs=(self.limits['memory_mb'], self.limits['recursion_limit']),
+        )
+
+    def _replace_pool(self, broken_pool):
+        """Swap a broken pool for a new one (only once per broken pool).
+
+        The pool fails its futures in submission order, so when the first
+        one reports the break the others still show whether a worker had
+        taken them; those that had (and the first one) are remembered as
+        started.
+        """
+        with self._lock:
+            if self._pool is broken_pool:
+                for attempt, pool in list(self._attempts.items()):
+                    if pool is broken_pool and (attempt.done() or attempt.running()):
+                        self._started.add(attempt)
+                broken_pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._create_pool(self.max_workers)
+            return self._pool
+
+    def _forget(self, inner):
+        """Drop a finished shared pool future; return True if it had started when its pool broke."""
+        with self._lock:
+            self._attempts.pop(inner, None)
+            started = inner in self._started
+            self._started.discard(inner)
+        return started
+
+    def _submit_shared(self, outer, function, args):
+        """Run a task on the shared pool; if the pool breaks while the task runs, retry it alone."""
+        with self._lock:
+            pool = self._pool
+        try:
+            inner = pool.submit(run_guarded, self.limits['wall_time'], function, *args)
+        except BrokenProcessPool:
+            pool = self._replace_pool(pool)
+            inner = pool.submit(run_guarded, self.limits['wall_time'], function, *args)
+        with self._lock:
+            self._attempts[inner] = pool
+        outer.attempt = inner
+
+        def done(inner):
+            if inner.cancelled():
+                self._forget(inner)
+                if not outer.cancelling:
+                    outer.cancel()  # The executor was shut down
+                return
+            if isinstance(inner.exception(), BrokenProcessPool):
+                outer.attempt = None
+                self._replace_pool(pool)
+                if self._forget(inner):
+                    self._submit_isolated(outer, function, args)
+                    return
+                try:
+                    self._submit_shared(outer, function, args)  # It never ran
+                except RuntimeError as e:  # The executor was shut down meanwhile
+                    with contextlib.suppress(InvalidStateError):
+                        outer.set_exception(e)
+            else:
+                self._forget(inner)
+                _copy_outcome(inner, outer)
+
+        inner.add_done_callback(done)
+
+    def _submit_isolated(self, outer, function, args):
+        """Queue a task to run alone, after the isolated tasks already queued."""
+        with self._lock:
+            self._isolation_queue.append((outer, function, args))
+            if self._isolation_busy:
+                return
+            self._isolation_busy = True
+        self._run_next_isolated()
+
+    def _run_next_isolated(self):
+        """Start the next queued task in the single-worker pool, once the previous one is done."""
+        while True:
+            with self._lock:
+                if not self._isolation_queue:
+                    self._isolation_busy = False
+                    return
+                outer, function, args = self._isolation_queue.popleft()
+                if outer.cancelled():
+                    continue
+                if self._isolation_pool is None:
+                    self._isolation_pool = self._create_pool(1)
+                pool = self._isolation_pool
+            try:
+                inner = pool.submit(run_guarded, self.limits['wall_time'], function, *args)
+            except RuntimeError as e:  # The executor was shut down meanwhile
+                outer.set_exception(e)
+                continue
+            outer.attempt = inner
+            break
+
+        def done(inner):
+            if inner.cancelled():
+                if not outer.cancelling:
+                    outer.cancel()  # The executor was shut down
+            elif isinstance(inner.exception(), BrokenProcessPool):
+                with self._lock:
+                    if self._isolation_pool is pool:
+                        self._isolation_pool = None
+                pool.shutdown(wait=False)
+                try:
+                    outer.set_exception(FileSkipped("worker process died (resource limit or crash)"))
+                except InvalidStateError:
+                    pass
+            else:
+                _copy_outcome(inner, outer)
+            self._run_next_isolated()
+
+        inner.add_done_callback(done)
+
+    def submit(self, function, *args, **kwargs):
+        """Schedule function(*args) under the limits and return a future for its result."""
+        if kwargs:
+            raise TypeError("GuardedExecutor.submit does not accept keyword arguments")
+        outer = _GuardedFuture()
+        self._submit_shared(outer, function, args)
+        return outer
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """Shut the process pools down."""
+        with self._lock:
+            pools = [self._pool] + ([self._isolation_pool] if self._isolation_pool is not None else [])
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+def run_with_limits(function, *args, limits=None):
+    """Run one call in a fresh guarded worker process and return its result.
+
+    Raises FileSkipped when the call hits a limit.
+    """
+    executor = GuardedExecutor(max_workers=1, limits=limits)
+    try:
+        return executor.submit(function, *args).result()
+    finally:
+        executor.shutdown()
@@ -6,53 +6,23 @@ import psutil
 import time
 import re
 import ast
-import difflib  # For generating diffs
-
-# Import custom rules
-from custom_rules import (
-    check_variable_naming,
-    check_function_naming,
-    check_class_naming,
-    check_indentation,
-    check_blank_lines_between_functions,
-    check_docstrings,
-    check_line_length,
-    check_imports_order,
-    check_trailing_whitespace,
-    check_multiple_statements,
-    check_comparison_is,
-    check_semicolons,
-    check_mutable_default_args,
-    check_end_blank_line,
-    check_unused_imports,
-    check_unused_variables,
-)
-
-def run_custom_tool(file_path):
+
+# Import the custom rule engine
+from parallel_engine import CustomRuleEngine
+
+# Import the diff engine and the cross-file symbol index used by the fixes
+from diff_engine import unified_diff
+from symbol_index import rename_in_tree, rename_references, top_level_names
+
+def run_custom_tool(file_path, engine):
     """Run the custom code style checker tool on the specified file."""
-    violations = []
-    try:
-        violations.extend(check_variable_naming(file_path))
-        violations.extend(check_function_naming(file_path))
-        violations.extend(check_class_naming(file_path))
-        violations.extend(check_indentation(file_path))
-        violations.extend(check_blank_lines_between_functions(file_path))
-        violations.extend(check_docstrings(file_path))
-        violations.extend(check_line_length(file_path))
-        violations.extend(check_imports_order(file_path))
-        violations.extend(check_trailing_whitespace(file_path))
-        violations.extend(check_multiple_statements(file_path))
-        violations.extend(check_comparison_is(file_path))
-        violations.extend(check_semicolons(file_path))
-        violations.extend(check_mutable_default_args(file_path))
-        violations.extend(check_end_blank_line(file_path))
-        violations.extend(check_unused_imports(file_path))
-        violations.extend(check_unused_variables(file_path))
-    except SyntaxError as e:
-        messagebox.showerror("Syntax Error", f"Invalid Python syntax in file: {e}")
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred while running the custom tool: {e}")
-    return violations
+    result = engine.check_file(file_path)
+    error = result['errors'].get('custom')
+    if error and error.startswith("Syntax error"):
+        messagebox.showerror("Syntax Error", f"Invalid Python syntax in file: {error}")
+    elif error:
+        messagebox.showerror("Error", f"An error occurred while running the custom tool: {error}")
+    return result['custom']
 
 def run_flake8(file_path):
     """Run Flake8 on the specified file and return violations."""
@@ -121,25 +91,25 @@ def fix_custom_violations(file_path):
             if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
                 used_names.add(node.id)
 
-        # Fix variable naming (snake_case)
+        # Collect the new names of variables and functions (snake_case) and classes (CapWords)
+        renames = {}
         for node in ast.walk(tree):
             if isinstance(node, ast.Assign):
                 for target in node.targets:
                     if isinstance(target, ast.Name):
                         if not re.match(r'^[a-z_][a-z0-9_]*$', target.id):
-                            target.id = re.sub(r'([A-Z])', r'_\1', target.id).lower()
-
-        # Fix function naming (snake_case)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
+                            renames[target.id] = re.sub(r'([A-Z])', r'_\1', target.id).lower()
+            elif isinstance(node, ast.FunctionDef):
                 if not re.match(r'^[a-z_][a-z0-9_]*$', node.name):
-                    node.name = re.sub(r'([A-Z])', r'_\1', node.name).lower()
-
-        # Fix class naming (CapWords)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
+                    renames[node.name] = re.sub(r'([A-Z])', r'_\1', node.name).lower()
+            elif isinstance(node, ast.ClassDef):
                 if not re.match(r'^[A-Z][A-Za-z0-9]*$', node.name):
-                    node.name = node.name.title().replace('_', '')
+                    renames[node.name] = node.name.title().replace('_', '')
+
+        # Rename the definitions and their references in this file; top-level
+        # names are also renamed in the modules that import them (see below)
+        exported_renames = {name: renames[name] for name in top_level_names(tree) if name in renames}
+        rename_in_tree(tree, renames)
 
         # Fix indentation (ensure 4 spaces per level)
         for node in ast.walk(tree):
@@ -201,13 +171,18 @@ def fix_custom_violations(file_path):
             file.write(fixed_code)
 
         # Generate a diff to show changes
-        diff = difflib.unified_diff(
+        diff_output = unified_diff(
             original_code,
             fixed_code.splitlines(keepends=True),
             fromfile='original/' + file_path,
             tofile='fixed/' + file_path,
         )
-        diff_output = ''.join(diff)
+
+        # Rename the references to renamed top-level names across the project in one batch
+        if exported_renames:
+            for updated_path, updated_diff in rename_references(file_path, exported_renames).items():
+                print(f"Renamed references in '{updated_path}'")
+                diff_output += updated_diff
         print("Generated diff output:", diff_output)  # Debug statement
         return diff_output
     except SyntaxError as e:
@@ -226,6 +201,9 @@ class CodeStyleCheckerApp:
         self.root.title("Automated Code Style Checker")
         self.root.geometry("1000x800")  # Increase the size of the main window
 
+        # Keep one warm worker pool for the custom rules while the window is open
+        self.engine = CustomRuleEngine()
+
         # File Selection
         self.file_path = None
         self.file_label = tk.Label(root, text="Selected File: None", font=("Arial", 12))
@@ -272,7 +250,7 @@ class CodeStyleCheckerApp:
         # Run custom tool
         start_time = time.time()
         start_memory = process.memory_info().rss  # Memory usage before running the tool
-        custom_violations = run_custom_tool(self.file_path)
+        custom_violations = run_custom_tool(self.file_path, self.engine)
         custom_time = time.time() - start_time
         custom_memory = process.memory_info().rss - start_memory  # Memory usage after running the tool
 
@@ -332,4 +310,5 @@ class CodeStyleCheckerApp:
 if __name__ == "__main__":
     root = tk.Tk()
     app = CodeStyleCheckerApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.engine.close()
\ No newline at end of file
@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from custom_rules import run_custom_checks
+from flake8_inprocess import run_flake8_inprocess
+from guardrails import FileSkipped
+from metrics import PROMETHEUS_CONTENT_TYPE, CheckerMetrics
+from parallel_engine import ENGINE_MODES, CustomRuleEngine
+from rule_overlap import merge_violations, plan_checks
+from suppression import build_suppression_index
+
+# Tools the service runs on every source
+SERVICE_TOOLS = ('custom', 'flake8')
+
+# Default address of the service (localhost only)
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Requests admitted at once; further requests get 429 Too Many Requests
+DEFAULT_QUEUE_SIZE = 32
+
+# Seconds a request may wait for its results before its unfinished files time out
+DEFAULT_REQUEST_TIMEOUT = 30
+
+# Results kept in the shared cache, keyed by the hash of the source
+DEFAULT_CACHE_SIZE = 4096
+
+# Largest request body accepted, in bytes
+DEFAULT_MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+def check_source(file_path, source, plan):
+    """Run the custom rules and flake8's checkers on one source in a worker.
+
+    Returns a result in the shape async_runner.check_file_async returns;
+    suppression comments apply to both engines.
+    """
+    result = {'file_path': file_path, 'custom': [], 'flake8': [], 'merged': [], 'timings': {}, 'rule_timings': {}, 'errors': {}, 'skipped': None}
+    suppressions = build_suppression_index(source)
+    start_time = time.perf_counter()
+    try:
+        result['custom'] = run_custom_checks(file_path, plan['custom_codes'], result['rule_timings'], source, suppressions)
+    except SyntaxError as e:
+        result['errors']['custom'] = f"Syntax error: {e}"
+    except (MemoryError, RecursionError):
+        raise  # Resource limits are reported by the guardrails as a skipped file
+    except Exception as e:
+        result['errors']['custom'] = str(e)
+    result['timings']['custom'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    try:
+        result['flake8'] = suppressions.filter(run_flake8_inprocess(file_path, source, plan['flake8_extend_ignore']))
+    except (MemoryError, RecursionError):
+        raise
+    except Exception as e:
+        result['errors']['flake8'] = str(e)
+    result['timings']['flake8'] = time.perf_counter() - start_time
+    result['merged'] = merge_violations(result['custom'], result['flake8'])
+    return result
+
+class ResultCache:
+    """A thread-safe LRU cache of check results shared by all requests."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        """Create an empty cache holding at most max_entries results."""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used one when full."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+def source_key(source):
+    """Return the cache key of a source (results do not depend on its path)."""
+    return hashlib.sha1(source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+def _file_response(file_path, result, cached=False):
+    """Build the JSON response of one file from a check result."""
+    return {
+        'path': file_path,
+        'violations': [
+            {key: violation[key] for key in ('line_number', 'column_number', 'code', 'message')}
+            for violation in result['merged']
+        ],
+        'errors': result['errors'],
+        'skipped': result['skipped'],
+        'cached': cached,
+    }
+
+class LintService:
+    """The checking side of the server: a warm worker pool, a result cache and admission control."""
+
+    def __init__(self, max_workers=None, mode='auto', queue_size=DEFAULT_QUEUE_SIZE,
+                 timeout=DEFAULT_REQUEST_TIMEOUT, cache_size=DEFAULT_CACHE_SIZE, limits=None):
+        """Start the worker pool."""
+        self.engine = CustomRuleEngine(max_workers, mode, limits)
+        self.plan = plan_checks(SERVICE_TOOLS)
+        self.timeout = timeout
+        self.cache = ResultCache(cache_size)
+        self.metrics = CheckerMetrics()
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    def admit(self):
+        """Take a request slot without waiting; return False when the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            return False
+        self._set_pending(1)
+        return True
+
+    def release(self):
+        """Give a request slot back."""
+        self._set_pending(-1)
+        self._slots.release()
+
+    def _set_pending(self, change):
+        with self._pending_lock:
+            self._pending += change
+            self.metrics.queue_depth.set(self._pending)
+
+    def check_batch(self, files):
+        """Check a batch of {'path', 'source'} files and return their responses in order.
+
+        Cached sources are answered without touching the pool; files still
+        running when the request times out are reported as timed out.
+        """
+        deadline = time.monotonic() + self.timeout
+        pending = []
+        for file in files:
+            key = source_key(file['source'])
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.cache_hits.inc()
+                pending.append((file['path'], key, cached, None))
+            else:
+                future = self.engine.executor.submit(check_source, file['path'], file['source'], self.plan)
+                pending.append((file['path'], key, None, future))
+
+        responses = []
+        for file_path, key, cached, future in pending:
+            if future is None:
+                responses.append(_file_response(file_path, cached, cached=True))
+                continue
+            try:
+                result = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                future.cancel()  # Frees the pool if the file is still queued; a running check finishes unseen
+                responses.append(_file_response(file_path, {'merged': [], 'errors': {'check': f"timed out after {self.timeout} seconds"}, 'skipped': None}))
+                continue
+            except FileSkipped as e:
+                responses.append(_file_response(file_path, {'merged': [], 'errors': {}, 'skipped': str(e)}))
+                continue
+            except Exception as e:
+                responses.append(_file_response(file_path, {'merged': [], 'errors': {'check': str(e)}, 'skipped': None}))
+                continue
+            self.metrics.observe_result(result)
+            if not result['errors']:
+                self.cache.put(key, result)
+            responses.append(_file_response(file_path, result))
+        return responses
+
+    def close(self):
+        """Shut the worker pool down."""
+        self.engine.close()
+
+def _parse_batch(body):
+    """Validate a request body and return its files; raise ValueError if it is malformed."""
+    payload = json.loads(body)
+    files = payload.get('files') if isinstance(payload, dict) else None
+    if not isinstance(files, list):
+        raise ValueError("expected a JSON object with a 'files' list")
+    for file in files:
+        if not (isinstance(file, dict) and isinstance(file.get('path'), str) and isinstance(file.get('source'), str)):
+            raise ValueError("every file needs a string 'path' and 'source'")
+    return files
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, max_request_bytes=DEFAULT_MAX_REQUEST_BYTES):
+    """Create the HTTP server for a service.
+
+    POST /check takes {"files": [{"path": ..., "source": ...}]} and returns
+    {"results": [...]}; GET /metrics returns Prometheus metrics and GET
+    /health a status object.
+    """
+    class LintRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type='application/json', headers=()):
+            data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send(200, service.metrics.registry.render().encode('utf-8'), PROMETHEUS_CONTENT_TYPE)
+            elif self.path == '/health':
+                self._send(200, {'status': 'ok', 'cached_results': len(service.cache)})
+            else:
+                self._send(404, {'error': f"no such endpoint: {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/check':
+                self._send(404, {'error': f"no such endpoint: {self.path}"})
+                return
+            length_header = self.headers.get('Content-Length')
+            if length_header is None:
+                self._send(411, {'error': "a Content-Length header is required"})
+                self.close_connection = True
+                return
+            try:
+                length = int(length_header)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._send(400, {'error': f"invalid Content-Length: {length_header!r}"})
+                self.close_connection = True
+                return
+            if length > max_request_bytes:
+                self._send(413, {'error': f"request body larger than {max_request_bytes} bytes"})
+                self.close_connection = True
+                return
+            body = self.rfile.read(length)
+            try:
+                files = _parse_batch(body)
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            if not service.admit():
+                self._send(429, {'error': "too many requests in progress"}, headers=[('Retry-After', '1')])
+                return
+            try:
+                results = service.check_batch(files)
+            finally:
+                service.release()
+            self._send(200, {'results': results})
+
+        def log_message(self, format, *args):
+            pass  # Keep per-request lines out of the service output
+
+    return ThreadingHTTPServer((host, port), LintRequestHandler)
+
+def serve_main(argv=None):
+    """Run the lint service until interrupted."""
+    parser = argparse.ArgumentParser(prog='style_checker.py serve', description="Serve style checks over HTTP on localhost.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on (default: %(default)s)")
+    parser.add_argument('--engine', choices=ENGINE_MODES, default='auto', help="run the checks on threads or processes (auto: threads only on free-threaded builds)")
+    parser.add_argument('--workers', type=int, help="number of workers (default: number of CPUs)")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help="requests admitted at once before answering 429 (default: %(default)s)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_REQUEST_TIMEOUT, help="seconds a request may take (default: %(default)s)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help="results kept in the shared cache (default: %(default)s)")
+    parser.add_argument('--max-request-bytes', type=int, default=DEFAULT_MAX_REQUEST_BYTES, help="largest request body accepted")
+    parser.add_argument('--file-timeout', type=float, metavar='SECONDS', help="skip a file whose checks run longer than this")
+    parser.add_argument('--memory-limit', type=int, metavar='MB', help="skip a file whose checks need more memory than this")
+    args = parser.parse_args(argv)
+
+    limits = None
+    if args.file_timeout or args.memory_limit:
+        limits = {'wall_time': args.file_timeout, 'memory_mb': args.memory_limit}
+        limits = {name: value for name, value in limits.items() if value}
+    service = LintService(args.workers, args.engine, args.queue_size, args.timeout, args.cache_size, limits)
+    server = make_server(service, args.host, args.port, args.max_request_bytes)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (POST /check, GET /metrics, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Base class of the metric types: a name, help text and one value per label set."""
+
+    kind = None
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._values[()] = self._initial_value()  # Export 0 before the first update
+
+    def _initial_value(self):
+        return 0
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects the labels: {', '.join(self.label_names) or 'none'}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def value(self, **labels):
+        """Return the current value for a label set (None if never set)."""
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def render(self):
+        """Return the lines of the metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key in sorted(self._values):
+                lines.extend(self._render_value(key, self._values[key]))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_number(value)}"]
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        """Set the gauge to value."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count.
+
+    The value of a label set is [per-bucket counts, sum, count].
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        """Create the histogram with the given bucket upper bounds."""
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, label_names)
+
+    def _initial_value(self):
+        return [[0] * len(self.buckets), 0.0, 0]
+
+    def observe(self, value, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, self._initial_value())
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', _format_number(float(bound)))])} {bucket_count}"
+            for bound, bucket_count in zip(self.buckets, counts)
+        ]
+        lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_number(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """The set of metrics exported together."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self.metrics = []
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        """Create and register a counter."""
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=()):
+        """Create and register a gauge."""
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        """Create and register a histogram."""
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+class CheckerMetrics:
+    """The metrics of a style checker run, fed from the per-file check results."""
+
+    def __init__(self, registry=None):
+        """Register the checker metrics in the registry (a new one by default)."""
+        self.registry = registry or MetricsRegistry()
+        self.files_checked = self.registry.counter('style_checker_files_checked_total', "Files checked.")
+        self.files_skipped = self.registry.counter('style_checker_files_skipped_total', "Files skipped after hitting a resource limit.")
+        self.violations = self.registry.counter('style_checker_violations_total', "Violations found, by code.", ['code'])
+        self.tool_errors = self.registry.counter('style_checker_tool_errors_total', "Tool runs that failed or timed out.", ['tool'])
+        self.cache_hits = self.registry.counter('style_checker_cache_hits_total', "Results served from the result cache.")
+        self.rule_duration = self.registry.histogram('style_checker_rule_duration_seconds', "Time spent in each custom rule per file.", ['rule'])
+        self.tool_duration = self.registry.histogram('style_checker_tool_duration_seconds', "Time spent in each tool per file.", ['tool'])
+        self.queue_depth = self.registry.gauge('style_checker_queue_depth', "Files waiting for or undergoing checks.")
+
+    def observe_result(self, result):
+        """Record one file's check result (see async_runner.check_file_async)."""
+        self.files_checked.inc()
+        if result.get('skipped'):
+            self.files_skipped.inc()
+        for violation in result.get('merged', []):
+            self.violations.inc(code=violation.get('code') or 'unknown')
+        for tool_name in result.get('errors', {}):
+            self.tool_errors.inc(tool=tool_name)
+        for rule_code, elapsed in result.get('rule_timings', {}).items():
+            self.rule_duration.observe(elapsed, rule=rule_code)
+        for tool_name, elapsed in result.get('timings', {}).items():
+            if tool_name != 'total':
+                self.tool_duration.observe(elapsed, tool=tool_name)
+
+def write_metrics_file(file_path, registry):
+    """Write the metrics to a file, replacing it atomically (for textfile collectors)."""
+    temporary_path = f"{file_path}.tmp"
+    with open(temporary_path, 'w') as file:
+        file.write(registry.render())
+    os.replace(temporary_path, file_path)
+
+def start_metrics_server(registry, port, host='127.0.0.1'):
+    """Serve the metrics on http://host:port/metrics from a daemon thread and return the server."""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scrapes out of the checker output
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class TraceRecorder:
+    """Collects per-file tool spans and writes them in the Chrome trace event format.
+
+    The file can be opened in chrome://tracing or ui.perfetto.dev. Each span
+    is placed on the first lane (shown as a thread) that is free at its start,
+    so overlapping checks appear side by side.
+    """
+
+    def __init__(self):
+        """Create an empty trace."""
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, duration, args=None):
+        """Record a span; start and duration are in seconds on the time.perf_counter clock."""
+        with self._lock:
+            self.spans.append((start, duration, name, args or {}))
+
+    def add_result(self, result):
+        """Record the file span and the tool spans of one check result."""
+        spans = result.get('spans', [])
+        if not spans:
+            return
+        start = min(span_start for _, span_start, _ in spans)
+        end = max(span_start + duration for _, span_start, duration in spans)
+        args = {'file': result['file_path']}
+        self.add_span(result['file_path'], start, end - start, {**args, 'violations': len(result.get('merged', []))})
+        for tool_name, span_start, duration in spans:
+            self.add_span(tool_name, span_start, duration, args)
+
+    def trace_events(self):
+        """Return the spans as Chrome trace 'complete' events, one lane per concurrent span."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: (span[0], -span[1]))
+        origin = spans[0][0] if spans else 0
+        lane_ends = []
+        events = []
+        for start, duration, name, args in spans:
+            lane = next((index for index, end in enumerate(lane_ends) if end <= start), len(lane_ends))
+            if lane == len(lane_ends):
+                lane_ends.append(0)
+            lane_ends[lane] = start + duration
+            events.append({
+                'name': name,
+                'cat': 'style_checker',
+                'ph': 'X',
+                'ts': round((start - origin) * 1e6, 3),
+                'dur': round(duration * 1e6, 3),
+                'pid': os.getpid(),
+                'tid': lane,
+                'args': args,
+            })
+        return events
+
+    def write(self, file_path):
+        """Write the trace to a JSON file."""
+        with open(file_path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, file)
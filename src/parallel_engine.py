@@ -0,0 +1,98 @@
+import os
+import sys
+import sysconfig
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from custom_rules import read_source, run_custom_checks
+from guardrails import FileSkipped, GuardedExecutor
+from suppression import build_suppression_index
+
+# Execution modes of the engine ('auto' picks threads only without a GIL)
+ENGINE_MODES = ('auto', 'thread', 'process')
+
+def is_free_threaded():
+    """Return True on a free-threaded (no-GIL) CPython build with the GIL disabled."""
+    if not sysconfig.get_config_var('Py_GIL_DISABLED'):
+        return False
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+def resolve_mode(mode='auto'):
+    """Turn 'auto' into 'thread' or 'process' for the running interpreter."""
+    if mode not in ENGINE_MODES:
+        raise ValueError(f"Unknown engine mode '{mode}' (expected one of {', '.join(ENGINE_MODES)})")
+    if mode == 'auto':
+        return 'thread' if is_free_threaded() else 'process'
+    return mode
+
+def check_file(file_path, codes=None, source=None):
+    """Run the custom checks on one file and return its result.
+
+    Everything the rules touch (source, AST, violation lists, timings) is
+    created inside this call, so files can be checked on any number of
+    threads at once without sharing mutable state. Suppression comments
+    are honoured.
+    """
+    result = {'file_path': file_path, 'custom': [], 'rule_timings': {}, 'errors': {}, 'skipped': None}
+    try:
+        source = read_source(file_path, source)
+        suppressions = build_suppression_index(source)
+        result['custom'] = run_custom_checks(file_path, codes, result['rule_timings'], source, suppressions)
+    except SyntaxError as e:
+        result['errors']['custom'] = f"Syntax error: {e}"
+    except (MemoryError, RecursionError):
+        raise  # Resource limits are reported by the guardrails as a skipped file
+    except Exception as e:
+        result['errors']['custom'] = str(e)
+    return result
+
+class CustomRuleEngine:
+    """A warm pool of workers for the custom rules, reused across many checks.
+
+    On a free-threaded build the pool uses threads, which scale across cores
+    without process start-up or pickling costs. With a GIL it falls back to
+    processes. Long-lived hosts (the GUI, daemons) keep one engine open.
+    With per-file limits (see guardrails.py) the engine always uses
+    processes, because limits can only be enforced on a worker process.
+    """
+
+    def __init__(self, max_workers=None, mode='auto', limits=None):
+        """Create the worker pool."""
+        self.mode = 'process' if limits is not None else resolve_mode(mode)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if limits is not None:
+            self.executor = GuardedExecutor(self.max_workers, limits)
+        elif self.mode == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def check_file(self, file_path, codes=None, source=None):
+        """Check one file on the pool and return its result."""
+        return self._result(file_path, self.executor.submit(check_file, file_path, codes, source))
+
+    def check_files(self, file_paths, codes=None, sources=None):
+        """Check many files on the pool and return their results in input order."""
+        sources = sources or {}
+        futures = [
+            self.executor.submit(check_file, file_path, codes, sources.get(file_path))
+            for file_path in file_paths
+        ]
+        return [self._result(file_path, future) for file_path, future in zip(file_paths, futures)]
+
+    def _result(self, file_path, future):
+        """Wait for a file's result, turning a limit hit into a skipped result."""
+        try:
+            return future.result()
+        except FileSkipped as e:
+            return {'file_path': file_path, 'custom': [], 'rule_timings': {}, 'errors': {}, 'skipped': str(e)}
+
+    def close(self):
+        """Shut the worker pool down."""
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,90 @@
+import argparse
+import json
+
+# Version of the JSON report format
+REPORT_VERSION = 1
+
+# Exit codes for batch runs
+EXIT_CLEAN = 0
+EXIT_VIOLATIONS = 1
+EXIT_ERROR = 2
+
+def format_violation(file_path, violation):
+    """Format a violation as path:line:column: CODE message."""
+    message = violation['message']
+    code = violation.get('code')
+    if code and not message.startswith(code):
+        message = f"{code} {message}"
+    return f"{file_path}:{violation['line_number']}:{violation['column_number']}: {message}"
+
+def build_report(file_reports, exit_code, shard=None):
+    """Build a JSON-serializable report from per-file violations and errors."""
+    return {
+        'version': REPORT_VERSION,
+        'shards': [shard] if shard else [],
+        'files': sorted(file_reports, key=lambda file_report: file_report['file_path']),
+        'violation_count': sum(len(file_report['violations']) for file_report in file_reports),
+        'exit_code': exit_code,
+    }
+
+def write_report(report_path, report):
+    """Write a report to a JSON file."""
+    with open(report_path, 'w') as file:
+        json.dump(report, file, indent=2)
+
+def load_report(report_path):
+    """Load a report from a JSON file."""
+    with open(report_path, 'r') as file:
+        report = json.load(file)
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(f"'{report_path}' is not a version {REPORT_VERSION} style checker report")
+    return report
+
+def missing_shards(shards):
+    """Return the 'K/N' specs absent from a list of shard specs that share the same N."""
+    counts = {int(shard.split('/')[1]) for shard in shards}
+    expected = {f"{index}/{count}" for count in counts for index in range(1, count + 1)}
+    return sorted(expected - set(shards))
+
+def merge_reports(reports):
+    """Merge per-shard reports into one; the exit code is the worst of all shards.
+
+    A shard that is missing from a sharded set makes the merged run an error.
+    """
+    file_reports = {}
+    shards = []
+    exit_code = EXIT_CLEAN
+    for report in reports:
+        shards.extend(report['shards'])
+        exit_code = max(exit_code, report['exit_code'])
+        for file_report in report['files']:
+            file_reports[file_report['file_path']] = file_report
+    if missing_shards(shards):
+        exit_code = EXIT_ERROR
+    merged = build_report(list(file_reports.values()), exit_code)
+    merged['shards'] = sorted(shards)
+    return merged
+
+def merge_main(argv=None):
+    """Merge shard reports, print their violations and return the combined exit code."""
+    parser = argparse.ArgumentParser(prog='style_checker.py merge', description="Merge per-shard JSON reports.")
+    parser.add_argument('reports', nargs='+', help="JSON reports written with --report")
+    parser.add_argument('--output', '-o', metavar='FILE', help="write the merged report to this file")
+    args = parser.parse_args(argv)
+
+    merged = merge_reports([load_report(report_path) for report_path in args.reports])
+    for file_report in merged['files']:
+        for tool_name, error in file_report['errors'].items():
+            print(f"{file_report['file_path']}: {tool_name} failed: {error}")
+        if file_report.get('skipped'):
+            print(f"{file_report['file_path']}: skipped: {file_report['skipped']}")
+        for violation in file_report['violations']:
+            print(format_violation(file_report['file_path'], violation))
+    missing = missing_shards(merged['shards'])
+    if missing:
+        print(f"Missing shard reports: {', '.join(missing)}")
+    print(f"\n{merged['violation_count']} violations found in {len(merged['files'])} files.")
+
+    if args.output:
+        write_report(args.output, merged)
+    return merged['exit_code']
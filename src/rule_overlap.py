@@ -0,0 +1,71 @@
+from custom_rules import CUSTOM_CHECKS
+
+# Custom rule codes that duplicate a flake8 (pycodestyle/pyflakes) check
+CUSTOM_TO_FLAKE8 = {
+    'CS007': ('E501',),  # Line length
+    'CS009': ('W291',),  # Trailing whitespace
+    'CS010': ('E702',),  # Multiple statements on one line
+    'CS012': ('E703',),  # Unnecessary semicolon
+    'CS014': ('W292',),  # End of file
+    'CS015': ('F401',),  # Unused imports
+}
+
+# Reverse lookup: flake8 code -> the custom code it duplicates
+FLAKE8_TO_CUSTOM = {
+    flake8_code: custom_code
+    for custom_code, flake8_codes in CUSTOM_TO_FLAKE8.items()
+    for flake8_code in flake8_codes
+}
+
+# Engine that runs an overlapping check by default
+DEFAULT_PREFERRED_ENGINE = 'flake8'
+
+def canonical_code(code):
+    """Map a flake8 code onto the custom code it duplicates, if any."""
+    return FLAKE8_TO_CUSTOM.get(code, code)
+
+def plan_checks(tools=('custom', 'flake8'), prefer=DEFAULT_PREFERRED_ENGINE):
+    """Decide which engine runs each overlapping check.
+
+    Returns a plan with the custom rule codes to run and the flake8 codes to
+    pass to --extend-ignore, so every overlapping check runs exactly once.
+    When only one engine is selected it keeps all of its checks.
+    """
+    custom_codes = list(CUSTOM_CHECKS)
+    flake8_extend_ignore = []
+    if 'custom' in tools and 'flake8' in tools:
+        if prefer == 'flake8':
+            custom_codes = [code for code in custom_codes if code not in CUSTOM_TO_FLAKE8]
+        elif prefer == 'custom':
+            flake8_extend_ignore = sorted(FLAKE8_TO_CUSTOM)
+        else:
+            raise ValueError(f"Unknown engine '{prefer}' (expected 'custom' or 'flake8')")
+    return {
+        'custom_codes': custom_codes,
+        'flake8_extend_ignore': flake8_extend_ignore,
+    }
+
+def violation_key(violation):
+    """Return the (line, column, code) key that identifies a violation across engines.
+
+    Overlapping rules flag a whole line and the two engines disagree on the
+    column they report, so their column is left out of the key.
+    """
+    code = canonical_code(violation.get('code'))
+    column = 0 if code in CUSTOM_TO_FLAKE8 else violation['column_number']
+    return (violation['line_number'], column, code)
+
+def merge_violations(custom_violations, flake8_violations):
+    """Merge the violations of both engines, dropping cross-engine duplicates.
+
+    A violation is dropped only when the other engine already reported the
+    same key, so repeated violations from a single engine are kept.
+    """
+    owners = {}
+    merged = []
+    for engine, violations in (('custom', custom_violations), ('flake8', flake8_violations)):
+        for violation in violations:
+            if owners.setdefault(violation_key(violation), engine) == engine:
+                merged.append(violation)
+    merged.sort(key=lambda v: (v['line_number'], v['column_number']))
+    return merged
@@ -0,0 +1,220 @@
+import argparse
+import json
+import sqlite3
+import time
+from collections import Counter
+
+# Default location of the run history database
+DEFAULT_HISTORY_DB = '.style_checker_history.sqlite'
+
+# Tools whose run times make up the recorded cost of a file
+COST_TOOLS = ('custom', 'flake8')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    tool_versions TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    file_path TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    custom_elapsed REAL,
+    flake8_elapsed REAL,
+    violation_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_file_results_run ON file_results (run_id);
+CREATE INDEX IF NOT EXISTS idx_file_results_path ON file_results (file_path, run_id);
+CREATE TABLE IF NOT EXISTS rule_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    rule_code TEXT NOT NULL,
+    elapsed REAL,
+    violation_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rule_results_run ON rule_results (run_id);
+CREATE INDEX IF NOT EXISTS idx_rule_results_rule ON rule_results (rule_code, run_id);
+CREATE TABLE IF NOT EXISTS file_rule_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    file_path TEXT NOT NULL,
+    rule_code TEXT NOT NULL,
+    violation_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_file_rule_results_run ON file_rule_results (run_id, file_path);
+"""
+
+def file_cost(timings):
+    """Return the cost of a file: the time its tools ran, without the time spent queued for a slot."""
+    return sum(timings.get(tool) or 0.0 for tool in COST_TOOLS)
+
+class RunHistory:
+    """Local sqlite store of per-file and per-rule costs across runs."""
+
+    def __init__(self, db_path=DEFAULT_HISTORY_DB):
+        """Open (and create if needed) the history database."""
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record_run(self, results, tool_versions, started_at=None):
+        """Store the results of one run and return its id.
+
+        Files are stored one row each; rule timings are aggregated over
+        the run, and rule violations are counted per file only where a file
+        has some, so growth can be compared over the files two runs share.
+        """
+        if started_at is None:
+            started_at = time.time()
+        rule_elapsed = Counter()
+        rule_violations = Counter()
+        file_rows = []
+        file_rule_rows = []
+        for result in results:
+            violations = result.get('merged', [])
+            file_rule_violations = Counter(violation.get('code') for violation in violations)
+            rule_violations.update(file_rule_violations)
+            file_rule_rows.extend(
+                (result['file_path'], code, count)
+                for code, count in sorted(file_rule_violations.items(), key=lambda item: str(item[0]))
+            )
+            rule_elapsed.update(result.get('rule_timings', {}))
+            timings = result.get('timings', {})
+            file_rows.append((
+                result['file_path'],
+                file_cost(timings),
+                timings.get('custom'),
+                timings.get('flake8'),
+                len(violations),
+            ))
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (started_at, tool_versions) VALUES (?, ?)",
+                (started_at, json.dumps(tool_versions, sort_keys=True)),
+            )
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO file_results (run_id, file_path, elapsed, custom_elapsed, flake8_elapsed, violation_count)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in file_rows],
+            )
+            self.connection.executemany(
+                "INSERT INTO rule_results (run_id, rule_code, elapsed, violation_count) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, code, rule_elapsed.get(code), rule_violations.get(code, 0))
+                    for code in sorted(set(rule_elapsed) | set(rule_violations), key=str)
+                ],
+            )
+            self.connection.executemany(
+                "INSERT INTO file_rule_results (run_id, file_path, rule_code, violation_count) VALUES (?, ?, ?, ?)",
+                [(run_id, *row) for row in file_rule_rows],
+            )
+        return run_id
+
+    def run_trends(self, limit=10):
+        """Return (run id, start time, files, total time, violations) for the latest runs."""
+        return self.connection.execute(
+            "SELECT runs.id, runs.started_at, COUNT(file_results.file_path),"
+            " COALESCE(SUM(file_results.elapsed), 0), COALESCE(SUM(file_results.violation_count), 0)"
+            " FROM runs LEFT JOIN file_results ON file_results.run_id = runs.id"
+            " GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+    def slowest_files(self, limit=10):
+        """Return (file path, average time, runs) for the most expensive files."""
+        return self.connection.execute(
+            "SELECT file_path, AVG(elapsed) AS average, COUNT(*) FROM file_results"
+            " GROUP BY file_path ORDER BY average DESC, file_path LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+    def growing_rules(self, limit=10):
+        """Return (rule code, previous count, latest count) for rules that grew in the latest run.
+
+        Only the files recorded in both runs are compared, so a shard or a
+        partial run does not look like growth. Nothing is reported when the
+        previous run predates the per-file rule counts.
+        """
+        run_ids = [row[0] for row in self.connection.execute(
+            "SELECT id FROM runs ORDER BY id DESC LIMIT 2"
+        )]
+        if len(run_ids) < 2:
+            return []
+        latest, previous = run_ids
+        has_violations = self.connection.execute(
+            "SELECT EXISTS (SELECT 1 FROM file_results WHERE run_id = ? AND violation_count > 0)", (previous,)
+        ).fetchone()[0]
+        has_rule_counts = self.connection.execute(
+            "SELECT EXISTS (SELECT 1 FROM file_rule_results WHERE run_id = ?)", (previous,)
+        ).fetchone()[0]
+        if has_violations and not has_rule_counts:
+            return []
+        return self.connection.execute(
+            "SELECT rule_code, previous_count, latest_count FROM ("
+            " SELECT rule_code,"
+            " SUM(CASE WHEN run_id = :previous THEN violation_count ELSE 0 END) AS previous_count,"
+            " SUM(CASE WHEN run_id = :latest THEN violation_count ELSE 0 END) AS latest_count"
+            " FROM file_rule_results"
+            " WHERE run_id IN (:previous, :latest) AND file_path IN ("
+            " SELECT file_path FROM file_results WHERE run_id = :latest"
+            " INTERSECT SELECT file_path FROM file_results WHERE run_id = :previous)"
+            " GROUP BY rule_code)"
+            " WHERE latest_count > previous_count"
+            " ORDER BY latest_count - previous_count DESC, rule_code LIMIT :limit",
+            {'previous': previous, 'latest': latest, 'limit': limit},
+        ).fetchall()
+
+    def file_costs(self):
+        """Return the most recent recorded time of every file, by path."""
+        return dict(self.connection.execute(
+            "SELECT file_path, elapsed FROM file_results"
+            " WHERE run_id = (SELECT MAX(run_id) FROM file_results AS latest"
+            " WHERE latest.file_path = file_results.file_path)"
+        ).fetchall())
+
+def order_by_cost(file_paths, costs):
+    """Order files with the most expensive first; unknown files keep their order after them."""
+    return sorted(file_paths, key=lambda file_path: -costs.get(file_path, 0.0))
+
+def history_main(argv=None):
+    """Print trends, the slowest files and growing rules from the run history."""
+    parser = argparse.ArgumentParser(prog='style_checker.py history', description="Query the run history.")
+    parser.add_argument('--db', default=DEFAULT_HISTORY_DB, help="history database (default: %(default)s)")
+    parser.add_argument('--limit', type=int, default=10, help="number of rows per section")
+    parser.add_argument('--export-timings', metavar='FILE', help="write the latest per-file costs as JSON (for --shard-timings)")
+    args = parser.parse_args(argv)
+
+    with RunHistory(args.db) as history:
+        if args.export_timings:
+            with open(args.export_timings, 'w') as file:
+                json.dump(history.file_costs(), file, indent=2, sort_keys=True)
+            print(f"Per-file costs written to '{args.export_timings}'.")
+            return 0
+
+        print("Recent runs:")
+        for run_id, started_at, file_count, elapsed, violation_count in history.run_trends(args.limit):
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started_at))
+            print(f"  #{run_id} {started}: {file_count} files, {elapsed:.3f} seconds, {violation_count} violations")
+
+        print("\nSlowest files:")
+        for file_path, average, runs in history.slowest_files(args.limit):
+            print(f"  {file_path}: {average:.6f} seconds on average over {runs} runs")
+
+        print("\nGrowing rules:")
+        growing = history.growing_rules(args.limit)
+        if not growing:
+            print("  No rule grew since the previous run.")
+        for rule_code, previous, latest in growing:
+            print(f"  {rule_code}: {previous} -> {latest} (+{latest - previous})")
+    return 0
@@ -0,0 +1,64 @@
+import heapq
+import json
+import os
+
+def parse_shard_spec(spec):
+    """Parse a 'K/N' shard spec into (K, N), with shards numbered from 1."""
+    try:
+        index_text, count_text = spec.split('/')
+        shard_index, shard_count = int(index_text), int(count_text)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}' (expected K/N, for example 2/4)")
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise ValueError(f"Invalid shard '{spec}' (K must be between 1 and N)")
+    return shard_index, shard_count
+
+def load_timings(timing_path):
+    """Load a JSON file that maps file paths to their past cost in seconds."""
+    with open(timing_path, 'r') as file:
+        return json.load(file)
+
+def estimate_costs(file_paths, timings=None):
+    """Estimate the cost of every file from past timings, falling back to its size.
+
+    Files that are not on disk (staged or archived sources) count as empty.
+    Files without a timing are estimated from their size at the average
+    seconds-per-byte of the timed files, so both kinds of cost stay
+    comparable.
+    """
+    sizes = {
+        file_path: os.path.getsize(file_path) if os.path.isfile(file_path) else 0
+        for file_path in file_paths
+    }
+    if not timings:
+        return {file_path: float(size) for file_path, size in sizes.items()}
+
+    timed = [file_path for file_path in file_paths if file_path in timings]
+    timed_bytes = sum(sizes[file_path] for file_path in timed)
+    timed_seconds = sum(timings[file_path] for file_path in timed)
+    seconds_per_byte = timed_seconds / timed_bytes if timed_bytes else 0.0
+    default_cost = timed_seconds / len(timed) if timed else 0.0
+    return {
+        file_path: timings.get(file_path, sizes[file_path] * seconds_per_byte or default_cost)
+        for file_path in file_paths
+    }
+
+def partition_files(file_paths, shard_count, costs):
+    """Split the files into shard_count balanced lists.
+
+    Files are assigned greedily, most expensive first, to the shard with the
+    smallest total so far. Ties are broken by path and shard number, so every
+    node computes the same partition from the same file list.
+    """
+    shards = [[] for _ in range(shard_count)]
+    loads = [(0.0, index) for index in range(shard_count)]
+    for file_path in sorted(file_paths, key=lambda file_path: (-costs[file_path], file_path)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(file_path)
+        heapq.heappush(loads, (load + costs[file_path], index))
+    return [sorted(shard) for shard in shards]
+
+def select_shard(file_paths, shard_index, shard_count, timings=None):
+    """Return the files that belong to shard K of N."""
+    costs = estimate_costs(file_paths, timings)
+    return partition_files(file_paths, shard_count, costs)[shard_index - 1]
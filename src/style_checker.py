@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 import time
@@ -5,47 +6,43 @@ import subprocess
 import psutil
 import re
 import ast
-import difflib
-
-from custom_rules import (
-    check_variable_naming,
-    check_function_naming,
-    check_class_naming,
-    check_indentation,
-    check_blank_lines_between_functions,
-    check_docstrings,
-    check_line_length,
-    check_imports_order,
-    check_trailing_whitespace,
-    check_multiple_statements,
-    check_comparison_is,
-    check_semicolons,
-    check_mutable_default_args,
-    check_end_blank_line,
-    check_unused_imports,
-    check_unused_variables,
+
+from archive_sources import ArchiveError, is_archive, read_archive_sources
+from async_runner import DEFAULT_MAX_CONCURRENCY, run_checks_concurrently
+from baseline import (
+    baseline_root,
+    filter_new_violations,
+    fingerprint_violations,
+    load_baseline,
+    save_baseline,
+)
+from custom_rules import read_lines, run_custom_checks
+from diff_engine import unified_diff
+from equivalence import equivalence_main
+from external_tools import parse_flake8_line, tool_versions
+from git_staged import GitError, read_staged_sources
+from guardrails import DEFAULT_LIMITS, FileSkipped, run_with_limits
+from lint_server import serve_main
+from metrics import CheckerMetrics, TraceRecorder, start_metrics_server, write_metrics_file
+from parallel_engine import ENGINE_MODES, CustomRuleEngine
+from reports import (
+    EXIT_CLEAN,
+    EXIT_ERROR,
+    EXIT_VIOLATIONS,
+    build_report,
+    format_violation,
+    merge_main,
+    write_report,
 )
+from run_history import RunHistory, history_main, order_by_cost
+from sharding import load_timings, parse_shard_spec, select_shard
+from symbol_index import apply_renames, plan_references, rename_in_tree, replace_file, top_level_names, walk_python_files
 
 def run_custom_tool(file_path):
     """Run the custom code style checker tool on the specified file."""
     violations = []
     try:
-        violations.extend(check_variable_naming(file_path))
-        violations.extend(check_function_naming(file_path))
-        violations.extend(check_class_naming(file_path))
-        violations.extend(check_indentation(file_path))
-        violations.extend(check_blank_lines_between_functions(file_path))
-        violations.extend(check_docstrings(file_path))
-        violations.extend(check_line_length(file_path))
-        violations.extend(check_imports_order(file_path))
-        violations.extend(check_trailing_whitespace(file_path))
-        violations.extend(check_multiple_statements(file_path))
-        violations.extend(check_comparison_is(file_path))
-        violations.extend(check_semicolons(file_path))
-        violations.extend(check_mutable_default_args(file_path))
-        violations.extend(check_end_blank_line(file_path))
-        violations.extend(check_unused_imports(file_path))
-        violations.extend(check_unused_variables(file_path))
+        violations.extend(run_custom_checks(file_path))
     except SyntaxError as e:
         print(f"Syntax error in file '{file_path}': {e}")
     except Exception as e:
@@ -61,16 +58,8 @@ def run_flake8(file_path):
         print(f"Flake8 Raw Output: {result.stdout}")  # Debug statement
         for line in result.stdout.splitlines():
             print(f"Processing line: {line}")  # Debug statement
-            # Flake8 output format: file_path:line_number:column_number:error_code message
-            match = re.match(r"^(.*):(\d+):(\d+):\s*(\w+\d+)\s*(.*)$", line)
-            if match:
-                file_part, line_number, column_number, error_code, message = match.groups()
-                violation = {
-                    'file_path': file_part.strip(),
-                    'line_number': int(line_number.strip()),
-                    'column_number': int(column_number.strip()),
-                    'message': f"{error_code} {message.strip()}",
-                }
+            violation = parse_flake8_line(line)
+            if violation is not None:
                 violations.append(violation)
             else:
                 print(f"Skipping invalid line: {line}")  # Debug if something unexpected appears
@@ -94,8 +83,19 @@ def run_autopep8(file_path):
         print(f"An error occurred while running autopep8: {e}")
         return ""
 
-def fix_custom_violations(file_path):
-    """Fix custom tool violations in the specified file."""
+def apply_autopep8(file_path):
+    """Apply autopep8 fixes to the specified file in place."""
+    try:
+        subprocess.run(['autopep8', '--in-place', file_path], capture_output=True, text=True)
+    except Exception as e:
+        print(f"An error occurred while running autopep8: {e}")
+
+def plan_custom_fixes(file_path):
+    """Work out the fixes for custom tool violations in the specified file, without writing anything.
+
+    Returns (fixed_code, diff_output, planned_renames), or None when the
+    file cannot be fixed; apply_custom_fixes writes the result.
+    """
     try:
         print(f"Fixing custom violations for file: {file_path}")  # Debug statement
 
@@ -119,25 +119,25 @@ def fix_custom_violations(file_path):
             if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
                 used_names.add(node.id)
 
-        # Fix variable naming (snake_case)
+        # Collect the new names of variables and functions (snake_case) and classes (CapWords)
+        renames = {}
         for node in ast.walk(tree):
             if isinstance(node, ast.Assign):
                 for target in node.targets:
                     if isinstance(target, ast.Name):
                         if not re.match(r'^[a-z_][a-z0-9_]*$', target.id):
-                            target.id = re.sub(r'([A-Z])', r'_\1', target.id).lower()
-
-        # Fix function naming (snake_case)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
+                            renames[target.id] = re.sub(r'([A-Z])', r'_\1', target.id).lower()
+            elif isinstance(node, ast.FunctionDef):
                 if not re.match(r'^[a-z_][a-z0-9_]*$', node.name):
-                    node.name = re.sub(r'([A-Z])', r'_\1', node.name).lower()
-
-        # Fix class naming (CapWords)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
+                    renames[node.name] = re.sub(r'([A-Z])', r'_\1', node.name).lower()
+            elif isinstance(node, ast.ClassDef):
                 if not re.match(r'^[A-Z][A-Za-z0-9]*$', node.name):
-                    node.name = node.name.title().replace('_', '')
+                    renames[node.name] = node.name.title().replace('_', '')
+
+        # Rename the definitions and their references in this file; top-level
+        # names are also renamed in the modules that import them (see below)
+        exported_renames = {name: renames[name] for name in top_level_names(tree) if name in renames}
+        rename_in_tree(tree, renames)
 
         # Fix indentation (ensure 4 spaces per level)
         for node in ast.walk(tree):
@@ -194,53 +194,61 @@ def fix_custom_violations(file_path):
         print("Fixed Code:")
         print(fixed_code)
 
-        # Write the fixed code back to the file
-        with open(file_path, 'w') as file:
-            file.write(fixed_code)
-
         # Generate a diff to show changes
-        diff = difflib.unified_diff(
+        diff_output = unified_diff(
             original_code,
             fixed_code.splitlines(keepends=True),
             fromfile='original/' + file_path,
             tofile='fixed/' + file_path,
         )
-        diff_output = ''.join(diff)
-        print("Generated diff output:", diff_output)  # Debug statement
-        return diff_output
+
+        # Plan the renames of references to renamed top-level names across the project
+        planned_renames = plan_references(file_path, exported_renames) if exported_renames else {}
+        return fixed_code, diff_output, planned_renames
     except SyntaxError as e:
         print(f"Syntax error in file '{file_path}': {e}")
+        return None
+    except (MemoryError, RecursionError):
+        raise  # Resource limits are reported by the guardrails as a skipped file
+    except Exception as e:
+        print(f"An error occurred while fixing custom violations: {e}")
+        return None
+
+def apply_custom_fixes(file_path, fixes):
+    """Write fixes planned by plan_custom_fixes and return their diff.
+
+    Each file is replaced atomically, so a fix is never left half written.
+    """
+    if fixes is None:
         return ""
+    fixed_code, diff_output, planned_renames = fixes
+    try:
+        # Write the fixed code back to the file
+        replace_file(file_path, fixed_code)
+
+        # Rename the references to renamed top-level names across the project in one batch
+        for updated_path, updated_diff in apply_renames(file_path, planned_renames).items():
+            print(f"Renamed references in '{updated_path}'")
+            diff_output += updated_diff
+        print("Generated diff output:", diff_output)  # Debug statement
+        return diff_output
     except Exception as e:
         print(f"An error occurred while fixing custom violations: {e}")
         return ""
 
-def benchmark_tool(custom_tool_function, flake8_function, autopep8_function, file_path):
-    """Benchmark the custom tool, Flake8, and autopep8."""
-    process = psutil.Process()
-
-    # Run custom tool
-    start_time = time.time()
-    start_memory = process.memory_info().rss
-    custom_violations = custom_tool_function(file_path)
-    custom_time = time.time() - start_time
-    custom_memory = process.memory_info().rss - start_memory
-
-    # Run flake8
-    start_time = time.time()
-    start_memory = process.memory_info().rss
-    flake8_violations = flake8_function(file_path)
-    flake8_time = time.time() - start_time
-    flake8_memory = process.memory_info().rss - start_memory
-
-    # Run autopep8
-    start_time = time.time()
-    start_memory = process.memory_info().rss
-    autopep8_output = autopep8_function(file_path)
-    autopep8_time = time.time() - start_time
-    autopep8_memory = process.memory_info().rss - start_memory
-
-    return custom_violations, flake8_violations, autopep8_output, custom_time, flake8_time, autopep8_time, custom_memory, flake8_memory, autopep8_memory
+def fix_custom_violations(file_path):
+    """Fix custom tool violations in the specified file."""
+    return apply_custom_fixes(file_path, plan_custom_fixes(file_path))
+
+# Tools reported in the interactive benchmark, with their display names
+BENCHMARK_TOOLS = (('custom', "Custom Tool"), ('flake8', "Flake8"), ('autopep8', "autopep8"))
+
+def display_benchmark(result, memory_used):
+    """Display the time each tool took in the concurrent run, and the memory the run used."""
+    for tool_name, display_name in BENCHMARK_TOOLS:
+        if tool_name in result['timings']:
+            print(f"{display_name} Execution Time: {result['timings'][tool_name]:.6f} seconds")
+    print(f"\nMemory Usage of the checks: {memory_used / 1024:.2f} KB")
 
 def display_violations(violations, tool_name):
     """Display violations found by a tool."""
@@ -251,8 +259,8 @@ def display_violations(violations, tool_name):
     else:
         print(f"\n{tool_name}: No violations found. Your code is clean!")
 
-def main():
-    """Main function to run the code style checker."""
+def interactive_main():
+    """Ask for files one at a time, then check, fix and benchmark each of them."""
     print("Welcome to the Automated Code Style Checker!")
     print("This tool checks your Python file for PEP 8 violations and provides feedback.\n")
 
@@ -277,46 +285,46 @@ def main():
             continue
 
         try:
-            # Run the custom tool and display results
-            print("\nRunning custom code style checker...")
-            custom_violations = run_custom_tool(file_path)
-            display_violations(custom_violations, "Custom Tool")
-
-            # Run flake8 and display results
-            print("\nRunning flake8...")
-            flake8_violations = run_flake8(file_path)
-            display_violations(flake8_violations, "Flake8")
-
-            # Run autopep8 and display results
-            print("\nRunning autopep8 to fix violations...")
-            autopep8_output = run_autopep8(file_path)
+            # Run the custom tool, flake8 and autopep8 (diff only) concurrently
+            print("\nRunning custom code style checker, flake8 and autopep8...")
+            process = psutil.Process()
+            start_memory = process.memory_info().rss
+            result = run_checks_concurrently([file_path])[0]
+            memory_used = process.memory_info().rss - start_memory
+            for tool_name, error in result['errors'].items():
+                print(f"An error occurred while running {tool_name}: {error}")
+            print(f"Checks finished in {result['timings']['total']:.6f} seconds")
+
+            display_violations(result['custom'], "Custom Tool")
+            display_violations(result['flake8'], "Flake8")
+
+            # Apply the autopep8 fixes only after every check has read the file
+            autopep8_output = result['autopep8']
             if autopep8_output:
                 print("\nautopep8 output:")
                 print(autopep8_output)
+                apply_autopep8(file_path)
             else:
                 print("\nautopep8: No fixes were applied.")
 
-            # Fix custom violations
+            # Plan the custom fixes in a worker process with resource limits, then
+            # write them here, so a worker stopped by a limit leaves every file intact
             print("\nFixing custom violations...")
-            custom_diff = fix_custom_violations(file_path)
+            try:
+                fixes = run_with_limits(plan_custom_fixes, file_path, limits=DEFAULT_LIMITS)
+            except FileSkipped as e:
+                print(f"Skipping the custom fixes for '{file_path}': {e}")
+                fixes = None
+            custom_diff = apply_custom_fixes(file_path, fixes)
             if custom_diff:
                 print("\nCustom Tool Fixes Applied:")
                 print(custom_diff)
             else:
                 print("\nCustom Tool: No fixes were applied.")
 
-            # Benchmark the tools
-            print("\nBenchmarking tools...")
-            custom_violations, flake8_violations, autopep8_output, custom_time, flake8_time, autopep8_time, custom_memory, flake8_memory, autopep8_memory = benchmark_tool(
-                run_custom_tool, run_flake8, run_autopep8, file_path)
-
-            print(f"\nCustom Tool Execution Time: {custom_time:.6f} seconds")
-            print(f"Flake8 Execution Time: {flake8_time:.6f} seconds")
-            print(f"autopep8 Execution Time: {autopep8_time:.6f} seconds")
-
-            print(f"\nCustom Tool Memory Usage: {custom_memory / 1024:.2f} KB")
-            print(f"Flake8 Memory Usage: {flake8_memory / 1024:.2f} KB")
-            print(f"autopep8 Memory Usage: {autopep8_memory / 1024:.2f} KB")
+            # Benchmark the tools from the concurrent run instead of running them again
+            print("\nBenchmark:")
+            display_benchmark(result, memory_used)
 
         except SyntaxError as e:
             print(f"\nSyntax error in file '{file_path}': {e}")
@@ -330,5 +338,230 @@ def main():
             print("Exiting the program. Goodbye!")
             break
 
+# Tools used for batch checks (autopep8 only matters when fixing)
+BATCH_TOOLS = ('custom', 'flake8')
+
+def discover_python_files(paths):
+    """Expand the given files and directories into a sorted list of Python files."""
+    file_paths = set()
+    for path in paths:
+        if os.path.isdir(path):
+            file_paths.update(walk_python_files(path))
+        else:
+            file_paths.add(os.path.normpath(path))
+    return sorted(file_paths)
+
+def collect_inputs(args, read_errors):
+    """Return the files to check, the in-memory sources of those not read from disk, and the archives.
+
+    Staged files that cannot be decoded are recorded in read_errors.
+    """
+    if args.staged:
+        sources = read_staged_sources(paths=args.paths, errors=read_errors)
+        return sorted(sources), sources, []
+
+    archive_paths = sorted({os.path.normpath(path) for path in args.paths if is_archive(path)})
+    file_paths = discover_python_files([path for path in args.paths if not is_archive(path)])
+    return file_paths, {}, archive_paths
+
+def stream_archive_members(archive_paths, archive_errors, read_errors):
+    """Yield (display path, source) for the members of every archive, one member at a time.
+
+    Archives are never extracted or read whole. An archive that cannot be
+    read is recorded in archive_errors and the other archives are still
+    read; a member that cannot be decoded is recorded in read_errors.
+    """
+    for archive_path in archive_paths:
+        try:
+            yield from read_archive_sources(archive_path, read_errors)
+        except ArchiveError as e:
+            archive_errors[archive_path] = str(e)
+
+def read_error_result(file_path, error):
+    """Return the check result of a file whose source could not be read."""
+    return {
+        'file_path': file_path, 'custom': [], 'flake8': [], 'merged': [], 'timings': {}, 'rule_timings': {},
+        'errors': {'read': error}, 'skipped': None, 'spans': [],
+    }
+
+def run_batch(args):
+    """Check every file given on the command line and return the exit code."""
+    read_errors = {}  # Inputs and archive members that could not be decoded, reported as failed files
+    try:
+        file_paths, sources, archive_paths = collect_inputs(args, read_errors)
+    except GitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if args.shard:
+        # Archives are streamed, so each one is sharded as a whole (costed by its size)
+        shard_index, shard_count = parse_shard_spec(args.shard)
+        timings = load_timings(args.shard_timings) if args.shard_timings else None
+        selected = set(select_shard(file_paths + archive_paths, shard_index, shard_count, timings))
+        file_paths = [file_path for file_path in file_paths if file_path in selected]
+        archive_paths = [archive_path for archive_path in archive_paths if archive_path in selected]
+    try:
+        baseline = load_baseline(args.baseline) if args.baseline else None
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot load the baseline: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    # Baseline paths are relative to the baseline file, so it matches from any directory
+    root = baseline_root(args.baseline_create or args.baseline) if args.baseline_create or args.baseline else None
+    history = RunHistory(args.history_db) if args.history_db else None
+    if history is not None:
+        # Start the most expensive files first so they do not finish last
+        file_paths = order_by_cost(file_paths, history.file_costs())
+
+    limits = None
+    if args.file_timeout or args.memory_limit:
+        limits = {'wall_time': args.file_timeout, 'memory_mb': args.memory_limit}
+        limits = {name: value for name, value in limits.items() if value}
+
+    metrics = CheckerMetrics() if args.metrics_file or args.metrics_port else None
+    trace = TraceRecorder() if args.trace_file else None
+    server = start_metrics_server(metrics.registry, args.metrics_port) if args.metrics_port else None
+    archive_errors = {}
+    member_sources = {}  # Sources of archive members the baseline still needs
+    keep_member_sources = bool(args.baseline_create or baseline is not None)
+    members_read = 0
+    results_seen = 0
+
+    def members():
+        nonlocal members_read
+        for display_path, source in stream_archive_members(archive_paths, archive_errors, read_errors):
+            members_read += 1
+            if keep_member_sources:
+                member_sources[display_path] = source
+            yield display_path, source
+
+    def observe(result):
+        nonlocal results_seen
+        results_seen += 1
+        if not result['merged']:
+            member_sources.pop(result['file_path'], None)
+        if metrics is not None:
+            metrics.observe_result(result)
+            metrics.queue_depth.set(len(file_paths) + members_read + len(read_errors) - results_seen)
+        if trace is not None:
+            trace.add_result(result)
+
+    if metrics is not None:
+        metrics.queue_depth.set(len(file_paths) + len(read_errors))
+    started_at = time.time()
+    with CustomRuleEngine(args.workers, args.engine, limits) as engine:
+        results = run_checks_concurrently(
+            file_paths,
+            max_concurrency=args.max_concurrency,
+            executor=engine.executor,
+            tools=BATCH_TOOLS,
+            on_result=observe,
+            sources=sources,
+            streamed=members(),
+        )
+    for file_path, error in sorted(read_errors.items()):
+        results.append(read_error_result(file_path, error))
+        observe(results[-1])
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    if args.metrics_file:
+        write_metrics_file(args.metrics_file, metrics.registry)
+    if trace is not None:
+        trace.write(args.trace_file)
+    results.sort(key=lambda result: result['file_path'])
+    if history is not None:
+        with history:
+            history.record_run(results, tool_versions(), started_at)
+
+    exit_code = EXIT_CLEAN
+    for archive_path, error in archive_errors.items():
+        print(f"{archive_path}: {error}")
+        exit_code = EXIT_ERROR
+    new_fingerprints = set()
+    file_reports = []
+    for result in results:
+        file_path = result['file_path']
+        for tool_name, error in result['errors'].items():
+            print(f"{file_path}: {tool_name} failed: {error}")
+            exit_code = EXIT_ERROR
+        if result['skipped']:
+            print(f"{file_path}: skipped: {result['skipped']}")
+
+        violations = result['merged']
+        if violations and (args.baseline_create or baseline is not None):
+            lines = read_lines(file_path, sources.get(file_path, member_sources.get(file_path)))
+        if args.baseline_create:
+            if violations:
+                new_fingerprints.update(fingerprint_violations(file_path, violations, lines, root))
+            continue
+        if baseline is not None and violations:
+            violations = filter_new_violations(file_path, violations, baseline, lines, root)
+        for violation in violations:
+            print(format_violation(file_path, violation))
+        file_reports.append({
+            'file_path': file_path,
+            'violations': violations,
+            'errors': result['errors'],
+            'skipped': result['skipped'],
+        })
+
+    if args.baseline_create:
+        save_baseline(args.baseline_create, new_fingerprints)
+        print(f"Baseline with {len(new_fingerprints)} violations written to '{args.baseline_create}'.")
+        return exit_code
+
+    violation_count = sum(len(file_report['violations']) for file_report in file_reports)
+    print(f"\n{violation_count} violations found in {len(results)} files.")
+    if violation_count and exit_code == EXIT_CLEAN:
+        exit_code = EXIT_VIOLATIONS
+    if args.report:
+        write_report(args.report, build_report(file_reports, exit_code, args.shard))
+    return exit_code
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Check Python files for code style violations.")
+    parser.add_argument('paths', nargs='*', help="files, directories or .zip/.whl/.tar.gz archives to check (interactive mode when omitted)")
+    parser.add_argument('--staged', action='store_true', help="check the content staged in the git index instead of the working tree (only under the given paths, if any)")
+    parser.add_argument('--baseline-create', metavar='FILE', help="record the current violations as a baseline and exit")
+    parser.add_argument('--baseline', metavar='FILE', help="only report violations that are not in the baseline")
+    parser.add_argument('--history-db', metavar='FILE', help="record per-file and per-rule costs in this sqlite database")
+    parser.add_argument('--shard', metavar='K/N', help="only check shard K of N of the discovered files")
+    parser.add_argument('--shard-timings', metavar='FILE', help="JSON file of past per-file costs used to balance shards")
+    parser.add_argument('--report', metavar='FILE', help="write the violations to a JSON report")
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY, help="maximum number of tool jobs running at once")
+    parser.add_argument('--engine', choices=ENGINE_MODES, default='auto', help="run the custom rules on threads or processes (auto: threads only on free-threaded builds)")
+    parser.add_argument('--workers', type=int, help="number of custom rule workers (default: number of CPUs)")
+    parser.add_argument('--file-timeout', type=float, metavar='SECONDS', help="skip a file whose custom checks run longer than this")
+    parser.add_argument('--memory-limit', type=int, metavar='MB', help="skip a file whose custom checks need more memory than this")
+    parser.add_argument('--metrics-file', metavar='FILE', help="write Prometheus metrics of the run to this file")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help="serve Prometheus metrics on localhost:PORT/metrics during the run")
+    parser.add_argument('--trace-file', metavar='FILE', help="write per-file spans to a Chrome trace JSON file")
+    args = parser.parse_args(argv)
+    if args.shard:
+        try:
+            parse_shard_spec(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+def main(argv=None):
+    """Main function to run the code style checker."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == 'history':
+        return history_main(argv[1:])
+    if argv and argv[0] == 'merge':
+        return merge_main(argv[1:])
+    if argv and argv[0] == 'equivalence':
+        return equivalence_main(argv[1:])
+    if argv and argv[0] == 'serve':
+        return serve_main(argv[1:])
+
+    args = parse_args(argv)
+    if not args.paths and not args.staged:
+        interactive_main()
+        return EXIT_CLEAN
+    return run_batch(args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,104 @@
+import bisect
+import io
+import re
+import tokenize
+
+from custom_rules import read_source
+from rule_overlap import CUSTOM_TO_FLAKE8, canonical_code
+
+# Suppresses every rule when a comment gives no codes
+ALL_CODES = '*'
+
+# '# noqa' or '# noqa: E501,CS001' on the line to suppress
+NOQA_PATTERN = re.compile(r'#\s*noqa\b(?::\s*(?P<codes>[A-Z]+[0-9]+(?:[,\s]+[A-Z]+[0-9]+)*))?', re.IGNORECASE)
+
+# '# style: ignore' or '# style: ignore[CS001, E501]' on the line to suppress
+IGNORE_PATTERN = re.compile(r'#\s*style:\s*ignore\b(?:\[(?P<codes>[^\]]*)\])?')
+
+# '# style: disable[...]' ... '# style: enable[...]' around a block of lines
+BLOCK_PATTERN = re.compile(r'#\s*style:\s*(?P<action>disable|enable)\b(?:\[(?P<codes>[^\]]*)\])?')
+
+def _parse_codes(codes_text):
+    """Split a comma or space separated code list; no list means every code."""
+    if not codes_text or not codes_text.strip():
+        return frozenset([ALL_CODES])
+    return frozenset(code.upper() for code in re.split(r'[,\s]+', codes_text.strip()) if code)
+
+def _code_aliases(code):
+    """Return the code plus its equivalents in the other engine (CS007 <-> E501)."""
+    custom_code = canonical_code(code)
+    return {code, custom_code, *CUSTOM_TO_FLAKE8.get(custom_code, ())}
+
+def _matches(codes, code):
+    """Return True if the suppressed codes cover the code (prefixes count, as in flake8)."""
+    if ALL_CODES in codes:
+        return True
+    return any(alias.startswith(prefix) for alias in _code_aliases(code) for prefix in codes)
+
+class SuppressionIndex:
+    """Line-indexed lookup of the suppression comments of one file."""
+
+    def __init__(self, line_codes=None, blocks=None, line_count=0):
+        """Create the index from per-line codes and (start, end, codes) blocks."""
+        self.line_codes = line_codes or {}
+        self.blocks = sorted(blocks or [])
+        self.block_starts = [start for start, _, _ in self.blocks]
+        self.line_count = line_count
+
+    def is_suppressed(self, line_number, code):
+        """Return True if the code is suppressed on the line."""
+        codes = self.line_codes.get(line_number)
+        if codes is not None and _matches(codes, code):
+            return True
+        # Only blocks that start at or before the line can cover it
+        for start, end, codes in self.blocks[:bisect.bisect_right(self.block_starts, line_number)]:
+            if line_number <= end and _matches(codes, code):
+                return True
+        return False
+
+    def is_rule_fully_suppressed(self, code):
+        """Return True if a block covering the whole file suppresses the code."""
+        return any(
+            start <= 1 and end >= self.line_count and _matches(codes, code)
+            for start, end, codes in self.blocks
+        )
+
+    def filter(self, violations):
+        """Return the violations that are not suppressed."""
+        return [
+            violation for violation in violations
+            if not self.is_suppressed(violation['line_number'], violation.get('code') or '')
+        ]
+
+def build_suppression_index(source):
+    """Collect the suppression comments of a source from its token stream, in one pass."""
+    line_codes = {}
+    blocks = []
+    open_blocks = {}  # Codes of each disable comment -> line it started on
+    line_count = source.count('\n') + (0 if source.endswith('\n') else 1)
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type != tokenize.COMMENT:
+                continue
+            line_number = token.start[0]
+            for pattern in (NOQA_PATTERN, IGNORE_PATTERN):
+                match = pattern.search(token.string)
+                if match:
+                    codes = _parse_codes(match.group('codes'))
+                    line_codes[line_number] = line_codes.get(line_number, frozenset()) | codes
+            match = BLOCK_PATTERN.search(token.string)
+            if match:
+                codes = _parse_codes(match.group('codes'))
+                if match.group('action') == 'disable':
+                    open_blocks.setdefault(codes, line_number)
+                elif codes in open_blocks:
+                    blocks.append((open_blocks.pop(codes), line_number - 1, codes))
+    except (tokenize.TokenError, SyntaxError):
+        pass  # Keep the comments seen before the source stopped tokenizing
+    for codes, start in open_blocks.items():
+        blocks.append((start, line_count, codes))
+    return SuppressionIndex(line_codes, blocks, line_count)
+
+def load_suppression_index(file_path, source=None):
+    """Build the suppression index of a file (or of its in-memory source)."""
+    return build_suppression_index(read_source(file_path, source))
@@ -0,0 +1,443 @@
+import ast
+import hashlib
+import io
+import json
+import os
+import subprocess
+import tempfile
+import tokenize
+
+from diff_engine import apply_edits, unified_diff_from_edits
+
+# Default location of the symbol index cache (relative to the project root)
+DEFAULT_SYMBOL_CACHE = '.style_checker_symbols.json'
+
+# Version of the cache format; other versions are ignored and rebuilt
+INDEX_VERSION = 2
+
+# Directories that hold environments, installed packages or build output rather than project code
+EXCLUDED_DIRECTORIES = {
+    '__pycache__', '__pypackages__', '_build', 'build', 'dist', 'env', 'node_modules', 'site-packages', 'venv',
+}
+
+def _is_excluded_directory(parent, name, skip_environments):
+    """Return True for a directory the walk skips (a virtualenv is recognised by its pyvenv.cfg)."""
+    if name.startswith('.') or name == '__pycache__':
+        return True
+    return skip_environments and (name in EXCLUDED_DIRECTORIES or os.path.exists(os.path.join(parent, name, 'pyvenv.cfg')))
+
+def walk_python_files(directory, skip_environments=False):
+    """Yield the .py files under a directory, skipping hidden directories and __pycache__.
+
+    With skip_environments, build output and virtualenv directories are
+    skipped too; the symbol index does this, the checks do not.
+    """
+    for current, subdirectories, file_names in os.walk(directory):
+        subdirectories[:] = [d for d in subdirectories if not _is_excluded_directory(current, d, skip_environments)]
+        for file_name in file_names:
+            if file_name.endswith('.py'):
+                yield os.path.normpath(os.path.join(current, file_name))
+
+def _git_paths(root, *args):
+    """Run a git command that lists .py paths under root; return them relative to root, or None outside a repository.
+
+    Paths inside excluded directories are dropped, since an untracked
+    virtualenv is not always ignored.
+    """
+    try:
+        result = subprocess.run(['git', *args, '--', '*.py'], cwd=root, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [
+        path for path in result.stdout.split('\0')
+        if path and not any(part.startswith('.') or part in EXCLUDED_DIRECTORIES for part in path.split('/')[:-1])
+    ]
+
+def project_python_files(root):
+    """Return the .py files of a project: those git tracks or would track, or a directory walk outside git."""
+    paths = _git_paths(root, 'ls-files', '-z', '--cached', '--others', '--exclude-standard')
+    if paths is None:
+        return list(walk_python_files(root, skip_environments=True))
+    return [os.path.normpath(os.path.join(root, path)) for path in paths]
+
+def _git_head(root):
+    """Return the commit checked out under root, or None outside a repository (or before the first commit)."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--verify', '-q', 'HEAD'], cwd=root, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def project_root(file_path):
+    """Return the git repository root of a file.
+
+    Outside a repository this is the directory above the file's top-level
+    package (the file's own directory if it is not in a package).
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'],
+            cwd=directory, capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    while os.path.exists(os.path.join(directory, '__init__.py')):
+        directory = os.path.dirname(directory)
+    return directory
+
+def module_name(relative_path):
+    """Return the dotted module name of a path relative to the project root."""
+    parts = os.path.splitext(os.path.normpath(relative_path))[0].split(os.sep)
+    if parts[-1] == '__init__' and len(parts) > 1:
+        parts.pop()
+    return '.'.join(parts)
+
+def _resolve_relative(module, relative_path, level, imported):
+    """Turn 'from ..x import y' in a module into the absolute module name."""
+    if not level:
+        return imported or ''
+    package = module.split('.')
+    if not relative_path.endswith('__init__.py'):
+        package.pop()
+    package = package[:len(package) - (level - 1)]
+    return '.'.join(package + ([imported] if imported else []))
+
+def top_level_names(tree):
+    """Return the names a module defines at its top level (functions, classes, variables)."""
+    names = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(target.id for target in node.targets if isinstance(target, ast.Name))
+    return names
+
+def rename_in_tree(tree, renames):
+    """Rename definitions and their references inside one module's AST.
+
+    Attributes are only renamed for names defined in a class body, so
+    'self.Method' follows a renamed method but unrelated attributes of
+    other objects are left alone.
+    """
+    member_names = {
+        member.name
+        for node in ast.walk(tree) if isinstance(node, ast.ClassDef)
+        for member in node.body if isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in renames:
+            node.id = renames[node.id]
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.name in renames:
+            node.name = renames[node.name]
+        elif isinstance(node, ast.Attribute) and node.attr in renames and node.attr in member_names:
+            node.attr = renames[node.attr]
+
+def scan_source(source, relative_path):
+    """Return the index entry of one source: its top-level definitions and its imports."""
+    module = module_name(relative_path)
+    tree = ast.parse(source)
+    imports = []         # [module, name, asname] for 'from module import name as asname'
+    module_imports = []  # [module, asname] for 'import module as asname'
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            imported = _resolve_relative(module, relative_path, node.level, node.module)
+            imports.extend([imported, alias.name, alias.asname] for alias in node.names)
+        elif isinstance(node, ast.Import):
+            module_imports.extend([alias.name, alias.asname] for alias in node.names)
+    return {
+        'module': module,
+        'definitions': sorted(top_level_names(tree)),
+        'imports': imports,
+        'module_imports': module_imports,
+    }
+
+def _module_matches(module, imported):
+    """Match an imported module name against a module, allowing for source roots on sys.path.
+
+    'custom_rules' matches 'src.custom_rules' because projects often put
+    a source directory on the path and import its modules by their last
+    components.
+    """
+    return module == imported or module.endswith('.' + imported)
+
+def _importer_keys(entry):
+    """Return the last module components under which a file is listed as an importer."""
+    keys = set()
+    for imported, name, _ in entry['imports']:
+        keys.add(imported.rsplit('.', 1)[-1])
+        keys.add(name)  # 'from package import module' imports a module
+    for imported, _ in entry['module_imports']:
+        keys.add(imported.rsplit('.', 1)[-1])
+    return keys
+
+class SymbolIndex:
+    """Project-wide index of top-level definitions and of the imports that reach them.
+
+    Entries are cached per file together with the file's size, mtime and
+    content hash, so an update only reads files whose stat changed and only
+    parses files whose content changed. Inside a git repository, refresh()
+    only looks at the files git reports as changed since the last refresh.
+    A reverse map from module names to
+    importing files is kept in step with the entries, so finding the
+    references to a symbol never scans the whole project.
+    """
+
+    def __init__(self, root, cache_path=None):
+        """Open the index of the project at root, loading the cache if there is one."""
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path or os.path.join(self.root, DEFAULT_SYMBOL_CACHE)
+        self.entries = {}
+        self.importers = {}
+        self.commit = None  # Commit the entries were last refreshed against
+        self.dirty = []     # Files that differed from that commit at the time
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r') as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return
+        if cache.get('version') == INDEX_VERSION and cache.get('root') == self.root:
+            for relative_path, entry in cache['files'].items():
+                self._add_entry(relative_path, entry)
+            self.commit = cache.get('commit')
+            self.dirty = cache.get('dirty', [])
+
+    def save(self):
+        """Write the cache, replacing the previous one atomically."""
+        temporary_path = f"{self.cache_path}.tmp"
+        with open(temporary_path, 'w') as file:
+            json.dump({'version': INDEX_VERSION, 'root': self.root, 'commit': self.commit, 'dirty': self.dirty, 'files': self.entries}, file)
+        os.replace(temporary_path, self.cache_path)
+
+    def _add_entry(self, relative_path, entry):
+        self.entries[relative_path] = entry
+        for key in _importer_keys(entry):
+            self.importers.setdefault(key, set()).add(relative_path)
+
+    def _remove_entry(self, relative_path):
+        entry = self.entries.pop(relative_path, None)
+        if entry is None:
+            return
+        for key in _importer_keys(entry):
+            paths = self.importers.get(key)
+            if paths is not None:
+                paths.discard(relative_path)
+                if not paths:
+                    del self.importers[key]
+
+    def relative_path(self, file_path):
+        """Return the key of a file in the index."""
+        return os.path.relpath(os.path.abspath(file_path), self.root)
+
+    def update(self, file_paths=None):
+        """Bring the index up to date with the given files (all project files by default).
+
+        When the whole project is scanned, files that no longer exist are
+        dropped. Returns the number of files that were parsed again.
+        """
+        prune = file_paths is None
+        if file_paths is None:
+            file_paths = project_python_files(self.root)
+        seen = set()
+        parsed = 0
+        for file_path in file_paths:
+            relative_path = self.relative_path(file_path)
+            seen.add(relative_path)
+            if self._update_file(relative_path):
+                parsed += 1
+        if prune:
+            for relative_path in set(self.entries) - seen:
+                self._remove_entry(relative_path)
+        return parsed
+
+    def refresh(self):
+        """Bring the whole index up to date, looking only at files changed since the last refresh.
+
+        Inside a git repository the candidates are the files that differ
+        from the commit of the last refresh, the untracked files and the
+        files that were dirty then; elsewhere every project file is checked.
+        Returns the number of files that were parsed again.
+        """
+        head = _git_head(self.root)
+        if head is None:
+            return self.update()
+        untracked = set(_git_paths(self.root, 'ls-files', '-z', '--others', '--exclude-standard') or ())
+        changed = None
+        if self.commit is not None:
+            changed = _git_paths(self.root, 'diff', '--name-only', '--relative', '-z', self.commit)
+        if changed is None:
+            parsed = self.update()  # First refresh, or the commit is gone (rebased away)
+        else:
+            candidates = set(changed) | untracked | set(self.dirty)
+            parsed = self.update(os.path.join(self.root, path) for path in sorted(candidates))
+        if self.commit != head:
+            changed = _git_paths(self.root, 'diff', '--name-only', '--relative', '-z', head) or []
+        self.commit = head
+        self.dirty = sorted(set(changed or ()) | untracked)
+        return parsed
+
+    def _update_file(self, relative_path):
+        """Refresh one entry; return True if the file had to be parsed."""
+        path = os.path.join(self.root, relative_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._remove_entry(relative_path)
+            return False
+        entry = self.entries.get(relative_path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return False
+
+        with open(path, 'rb') as file:
+            data = file.read()
+        content_hash = hashlib.sha1(data).hexdigest()
+        if entry and entry['hash'] == content_hash:
+            entry['mtime_ns'], entry['size'] = stat.st_mtime_ns, stat.st_size
+            return False
+        try:
+            with tokenize.open(path) as file:
+                new_entry = scan_source(file.read(), relative_path)
+        except (SyntaxError, UnicodeDecodeError, ValueError):
+            new_entry = {'module': module_name(relative_path), 'definitions': [], 'imports': [], 'module_imports': []}
+        new_entry.update({'hash': content_hash, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size})
+        self._remove_entry(relative_path)
+        self._add_entry(relative_path, new_entry)
+        return True
+
+    def references(self, file_path, names):
+        """Return how other files refer to top-level names of a file.
+
+        The result maps each importing file to (bare, imported, attributes):
+        names bound by 'from module import name', names imported under an
+        alias (only the import itself refers to them) and (module alias,
+        name) pairs used as 'alias.name'.
+        """
+        relative_path = self.relative_path(file_path)
+        module = module_name(relative_path)
+        last_component = module.rsplit('.', 1)[-1]
+        names = set(names)
+        found = {}
+        for importer in sorted(self.importers.get(last_component, ())):
+            if importer == relative_path:
+                continue
+            entry = self.entries[importer]
+            bare, imported, attributes = set(), set(), set()
+            for imported_module, name, asname in entry['imports']:
+                if name in names and _module_matches(module, imported_module):
+                    (imported if asname else bare).add(name)
+                elif _module_matches(module, f"{imported_module}.{name}" if imported_module else name):
+                    attributes.update((asname or name, symbol) for symbol in names)
+            for imported_module, asname in entry['module_imports']:
+                if _module_matches(module, imported_module):
+                    # 'import a.b' is used as 'a.b.name'; the token before the name is 'b'
+                    alias = asname or imported_module.rsplit('.', 1)[-1]
+                    attributes.update((alias, symbol) for symbol in names)
+            if bare or imported or attributes:
+                found[importer] = (bare, imported, attributes)
+        return found
+
+def rename_edits(lines, renames, bare=(), imported=(), attributes=()):
+    """Return the line edits that rename references in a source, as (i1, i2, new_lines).
+
+    bare names are renamed wherever they appear as a name that is not an
+    attribute, imported names only inside 'from ... import' statements, and
+    (alias, name) pairs where the name follows 'alias.'.
+    """
+    tokens = []
+    previous = []  # The last two significant tokens
+    in_from_import = False
+    for token in tokenize.generate_tokens(iter(lines).__next__):
+        if token.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+            in_from_import = False
+        elif token.type == tokenize.NAME and token.string == 'from' and not previous:
+            in_from_import = True
+        elif token.type == tokenize.NAME and token.string in renames:
+            after_dot = bool(previous) and previous[-1].string == '.'
+            if not after_dot and (token.string in bare or (in_from_import and token.string in imported)):
+                tokens.append(token)
+            elif after_dot and len(previous) > 1 and (previous[-2].string, token.string) in attributes:
+                tokens.append(token)
+        if token.type in (tokenize.NEWLINE, tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT):
+            if token.type == tokenize.NEWLINE:
+                previous = []
+            continue
+        previous = (previous + [token])[-2:]
+
+    new_lines = {}
+    for token in sorted(tokens, key=lambda token: token.start, reverse=True):
+        row, column = token.start
+        line = new_lines.get(row, lines[row - 1])
+        new_lines[row] = line[:column] + renames[token.string] + line[column + len(token.string):]
+    return [(row - 1, row, [line]) for row, line in sorted(new_lines.items())]
+
+def rename_tokens(source, renames, bare=(), imported=(), attributes=()):
+    """Rename references in a source by editing its tokens, keeping all other text."""
+    lines = io.StringIO(source).readlines()
+    return ''.join(apply_edits(lines, rename_edits(lines, renames, bare, imported, attributes)))
+
+def plan_renames(index, file_path, renames):
+    """Return {path: (lines, edits)} for every other file that refers to renamed top-level names."""
+    planned = {}
+    for relative_path, (bare, imported, attributes) in index.references(file_path, renames).items():
+        path = os.path.join(index.root, relative_path)
+        with tokenize.open(path) as file:
+            lines = io.StringIO(file.read()).readlines()
+        edits = rename_edits(lines, renames, bare, imported, attributes)
+        if edits:
+            planned[path] = (lines, edits)
+    return planned
+
+def replace_file(path, text):
+    """Write a file through a temporary file next to it, so it is never left half written."""
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            file.write(text)
+        if os.path.exists(path):
+            os.chmod(temporary_path, os.stat(path).st_mode & 0o7777)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+def plan_references(file_path, renames, root=None, cache_path=None):
+    """Return {path: (lines, edits)} renaming the references to top-level names of a file, without writing.
+
+    The index is brought up to date first (only changed files are read)
+    and saved, so the plan can be made in a worker process and written by
+    apply_renames in the caller.
+    """
+    index = SymbolIndex(root or project_root(file_path), cache_path)
+    index.refresh()
+    index.save()
+    return plan_renames(index, file_path, renames)
+
+def apply_renames(file_path, planned, root=None, cache_path=None):
+    """Write the files of a rename plan and update the index of the project.
+
+    Returns {path: diff} for the files that were rewritten; the diffs are
+    built from the edits, without diffing the files.
+    """
+    if not planned:
+        return {}
+    diffs = {}
+    for path, (lines, edits) in planned.items():
+        replace_file(path, ''.join(apply_edits(lines, edits)))
+        display_path = os.path.relpath(path)
+        diffs[path] = unified_diff_from_edits(lines, edits, fromfile='original/' + display_path, tofile='fixed/' + display_path)
+    index = SymbolIndex(root or project_root(file_path), cache_path)
+    index.update(planned)
+    index.save()
+    return diffs
+
+def rename_references(file_path, renames, root=None, cache_path=None):
+    """Rename the references to top-level names of a file across its project.
+
+    Every affected file is rewritten in one batch; returns {path: diff}
+    for the files that were rewritten.
+    """
+    return apply_renames(file_path, plan_references(file_path, renames, root, cache_path), root, cache_path)
@@ -0,0 +1,86 @@
+import argparse
+import os
+import random
+
+# Module sizes (in lines) used when writing a corpus from the command line
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+def _function_block(index, import_count):
+    """A function with a local out-of-order import, a bad name and a semicolon."""
+    return [
+        f"def function_{index}(value, items=None):",
+        f"    \"\"\"Generated function number {index}.\"\"\"",
+        f"    import module_{import_count - index:07d}",
+        f"    Total_{index} = value + {index};",
+        "    if value is None:",
+        "        return items",
+        f"    return Total_{index}",
+        "",
+    ]
+
+def _class_block(index):
+    """A class with a badly named class, a method without docstring and a comparison."""
+    return [
+        f"class generated_class_{index}:",
+        f"    def Method_{index}(self, other):",
+        "        if other == None:",
+        "            return self",
+        "        return other",
+        "",
+    ]
+
+def _statement_block(index):
+    """Module-level statements: a long line, trailing whitespace and two statements on one line."""
+    return [
+        f"CONSTANT_{index} = '{'x' * 80}'",
+        f"unused_{index} = {index}   ",
+        f"first_{index} = 1; second_{index} = 2",
+        "",
+    ]
+
+def generate_module(line_count, seed=0):
+    """Generate the source of a valid module of roughly line_count lines.
+
+    The module mixes many function and class definitions with many local
+    imports in descending order, so rules that rescan the file per
+    definition or per import show their cost.
+    """
+    rng = random.Random(seed)
+    import_count = line_count
+    lines = ['"""Synthetic module generated for style checker tests."""', '']
+    header_imports = [f"import header_module_{index:03d}" for index in range(20)]
+    rng.shuffle(header_imports)
+    lines.extend(header_imports)
+    lines.append('')
+
+    index = 0
+    while len(lines) < line_count:
+        kind = rng.random()
+        if kind < 0.5:
+            lines.extend(_function_block(index, import_count))
+        elif kind < 0.8:
+            lines.extend(_class_block(index))
+        else:
+            lines.extend(_statement_block(index))
+        index += 1
+    return '\n'.join(lines).rstrip() + '\n'
+
+def write_corpus(directory, sizes=DEFAULT_SIZES, seed=0):
+    """Write one generated module per size into the directory and return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    file_paths = []
+    for size in sizes:
+        file_path = os.path.join(directory, f"synthetic_{size}.py")
+        with open(file_path, 'w') as file:
+            file.write(generate_module(size, seed))
+        file_paths.append(file_path)
+    return file_paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic modules for stress-testing the rules.")
+    parser.add_argument('directory', help="directory to write the modules to")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="module sizes in lines")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    args = parser.parse_args()
+    for written_path in write_corpus(args.directory, args.sizes, args.seed):
+        print(written_path)
@@ -0,0 +1,93 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from src.archive_sources import ArchiveError, is_archive, read_archive_sources
+from src.custom_rules import run_custom_checks
+from src.reports import EXIT_ERROR
+from src.style_checker import main
+
+MEMBERS = {
+    'pkg/module.py': b"BadName = 1\n",
+    'pkg/data.txt': b"not python\n",
+}
+
+
+class TestArchiveSources(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_is_archive(self):
+        self.assertTrue(is_archive('dist/package-1.0-py3-none-any.whl'))
+        self.assertTrue(is_archive('dist/package-1.0.tar.gz'))
+        self.assertFalse(is_archive('src/module.py'))
+
+    def test_reads_python_members_of_wheel(self):
+        archive_path = os.path.join(self.directory, 'package.whl')
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            for name, data in MEMBERS.items():
+                archive.writestr(name, data)
+        self.check_sources(archive_path)
+
+    def test_reads_python_members_of_tarball(self):
+        archive_path = os.path.join(self.directory, 'package.tar.gz')
+        with tarfile.open(archive_path, 'w:gz') as archive:
+            for name, data in MEMBERS.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        self.check_sources(archive_path)
+
+    def test_unreadable_archive_raises_archive_error(self):
+        with self.assertRaises(ArchiveError):
+            list(read_archive_sources(os.path.join(self.directory, 'missing.zip')))
+        archive_path = os.path.join(self.directory, 'broken.tar.gz')
+        with open(archive_path, 'wb') as file:
+            file.write(b"not a tarball")
+        with self.assertRaises(ArchiveError):
+            list(read_archive_sources(archive_path))
+
+    def test_undecodable_member_is_reported(self):
+        archive_path = os.path.join(self.directory, 'package.zip')
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            archive.writestr('pkg/latin.py', b'x = "\xff"\n')
+            for name, data in MEMBERS.items():
+                archive.writestr(name, data)
+        with self.assertRaises(SyntaxError):
+            list(read_archive_sources(archive_path))
+        errors = {}
+        self.assertEqual(list(dict(read_archive_sources(archive_path, errors))), [f"{archive_path}!pkg/module.py"])
+        self.assertEqual(list(errors), [f"{archive_path}!pkg/latin.py"])
+
+        report_path = os.path.join(self.directory, 'report.json')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exit_code = main(['--report', report_path, archive_path])
+        self.assertEqual(exit_code, EXIT_ERROR)
+        self.assertIn(f"{archive_path}!pkg/latin.py: read failed: cannot decode", output.getvalue())
+        self.assertIn("in 2 files.", output.getvalue())
+        with open(report_path) as file:
+            report = json.load(file)
+        [failed] = [file_report for file_report in report['files'] if file_report['errors']]
+        self.assertEqual(failed['file_path'], f"{archive_path}!pkg/latin.py")
+
+    def check_sources(self, archive_path):
+        sources = dict(read_archive_sources(archive_path))
+        display_path = f"{archive_path}!pkg/module.py"
+        self.assertEqual(sources, {display_path: "BadName = 1\n"})
+        violations = run_custom_checks(display_path, codes=['CS001'], source=sources[display_path])
+        self.assertEqual(violations[0]['line_number'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
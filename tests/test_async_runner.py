@@ -0,0 +1,55 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+from src.async_runner import run_checks_concurrently, run_external_tool
+
+
+class TestAsyncRunner(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.file_path = tempfile.mkstemp(suffix='.py')
+        with os.fdopen(handle, 'w') as file:
+            file.write("import os\nBadName = 1\n")
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def test_custom_checks_run_in_executor(self):
+        results = run_checks_concurrently([self.file_path], tools=('custom',))
+        self.assertEqual(len(results), 1)
+        messages = [v['message'] for v in results[0]['custom']]
+        self.assertIn("Variable 'BadName' should be snake_case", messages)
+        self.assertEqual(results[0]['errors'], {})
+
+    def test_results_cover_every_file(self):
+        results = run_checks_concurrently([self.file_path] * 3, max_concurrency=2, tools=('custom',))
+        self.assertEqual(len(results), 3)
+
+    def test_streamed_sources_are_read_lazily(self):
+        in_memory = []
+
+        def stream():
+            for number in range(10):
+                in_memory.append(f"member_{number}.py")
+                yield f"member_{number}.py", "BadName = 1\n"
+
+        def on_result(result):
+            self.assertLessEqual(len(in_memory), 2)
+            if result['file_path'] in in_memory:
+                in_memory.remove(result['file_path'])
+
+        results = run_checks_concurrently([self.file_path], max_concurrency=2, tools=('custom',), on_result=on_result, streamed=stream())
+        self.assertEqual(len(results), 11)
+        self.assertEqual(in_memory, [])
+
+    def test_external_tool_timeout_kills_process(self):
+        command = [sys.executable, '-c', 'import time; time.sleep(10)']
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run_external_tool(command, timeout=0.2))
+
+
+if __name__ == "__main__":
+    unittest.main()
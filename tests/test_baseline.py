@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from src.baseline import (
+    baseline_root,
+    filter_new_violations,
+    fingerprint_violations,
+    load_baseline,
+    save_baseline,
+)
+from src.reports import EXIT_ERROR
+from src.style_checker import main
+
+
+def violation(line_number, code='CS001'):
+    return {'line_number': line_number, 'column_number': 0, 'code': code, 'message': 'message'}
+
+
+class TestBaseline(unittest.TestCase):
+
+    def test_fingerprint_ignores_line_numbers(self):
+        lines = ["x = 1\n", "BadName = 2\n", "y = 3\n"]
+        shifted = ["\n", "\n"] + lines
+        original = fingerprint_violations('module.py', [violation(2)], lines)
+        moved = fingerprint_violations('module.py', [violation(4)], shifted)
+        self.assertEqual(original, moved)
+
+    def test_identical_lines_get_distinct_fingerprints(self):
+        lines = ["BadName = 2\n"] * 3
+        fingerprints = fingerprint_violations('module.py', [violation(2), violation(2)], lines)
+        self.assertEqual(len(set(fingerprints)), 2)
+
+    def test_round_trip_filters_known_violations(self):
+        lines = ["import os\n", "BadName = 2\n"]
+        known = [violation(2)]
+        handle, baseline_path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            save_baseline(baseline_path, fingerprint_violations('module.py', known, lines))
+            baseline = load_baseline(baseline_path)
+        finally:
+            os.remove(baseline_path)
+
+        current = known + [violation(1, code='F401')]
+        new_violations = filter_new_violations('module.py', current, baseline, lines)
+        self.assertEqual([v['code'] for v in new_violations], ['F401'])
+
+    def test_paths_are_relative_to_the_baseline_file(self):
+        lines = ["BadName = 2\n"]
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, 'pkg'))
+            root = baseline_root(os.path.join(directory, 'baseline.txt'))
+            original_directory = os.getcwd()
+            try:
+                os.chdir(directory)
+                from_root = fingerprint_violations(os.path.join('pkg', 'module.py'), [violation(1)], lines, root)
+                os.chdir(os.path.join(directory, 'pkg'))
+                from_package = fingerprint_violations('module.py', [violation(1)], lines, root)
+            finally:
+                os.chdir(original_directory)
+        self.assertEqual(from_root, from_package)
+
+    def test_unusable_baseline_is_an_error(self):
+        with tempfile.TemporaryDirectory() as directory:
+            module_path = os.path.join(directory, 'module.py')
+            with open(module_path, 'w') as file:
+                file.write('"""Module."""\n')
+            malformed_path = os.path.join(directory, 'malformed.txt')
+            with open(malformed_path, 'w') as file:
+                file.write("not a baseline\n")
+            for baseline_path in (os.path.join(directory, 'missing.txt'), malformed_path):
+                errors = io.StringIO()
+                with contextlib.redirect_stderr(errors), contextlib.redirect_stdout(io.StringIO()):
+                    exit_code = main(['--baseline', baseline_path, module_path])
+                self.assertEqual(exit_code, EXIT_ERROR)
+                self.assertEqual(len(errors.getvalue().splitlines()), 1)
+                self.assertIn("cannot load the baseline", errors.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
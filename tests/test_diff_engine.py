@@ -0,0 +1,66 @@
+import difflib
+import random
+import unittest
+
+from src.diff_engine import DIFF_ALGORITHMS, apply_edits, unified_diff, unified_diff_from_edits
+
+
+def apply_opcodes(a, b, opcodes):
+    result = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            result.extend(a[i1:i2])
+        else:
+            result.extend(b[j1:j2])
+    return result
+
+
+class TestDiffEngine(unittest.TestCase):
+
+    def test_opcodes_rebuild_the_new_lines(self):
+        generator = random.Random(7)
+        for _ in range(300):
+            a = [generator.choice('abcd') + '\n' for _ in range(generator.randint(0, 25))]
+            b = [generator.choice('abcd') + '\n' for _ in range(generator.randint(0, 25))]
+            for name, algorithm in DIFF_ALGORITHMS.items():
+                for max_cost in (1, 1000):
+                    with self.subTest(algorithm=name, max_cost=max_cost):
+                        opcodes = algorithm(a, b, max_cost)
+                        self.assertEqual(apply_opcodes(a, b, opcodes), b)
+                        for tag, i1, i2, j1, j2 in opcodes:
+                            if tag == 'equal':
+                                self.assertEqual(a[i1:i2], b[j1:j2])
+
+    def test_myers_finds_a_shortest_diff(self):
+        generator = random.Random(11)
+        for _ in range(200):
+            a = [generator.choice('abc') for _ in range(generator.randint(0, 20))]
+            b = [generator.choice('abc') for _ in range(generator.randint(0, 20))]
+            matched = sum(i2 - i1 for tag, i1, i2, _, _ in DIFF_ALGORITHMS['myers'](a, b, 1000) if tag == 'equal')
+            longest = sum(block.size for block in difflib.SequenceMatcher(None, a, b, autojunk=False).get_matching_blocks())
+            self.assertGreaterEqual(matched, longest)
+
+    def test_unified_format_matches_difflib(self):
+        a = [f"line {i}\n" for i in range(40)]
+        b = a[:5] + ["new\n"] + a[6:30] + a[31:]
+        expected = ''.join(difflib.unified_diff(a, b, 'original/x.py', 'fixed/x.py'))
+        for algorithm in DIFF_ALGORITHMS:
+            self.assertEqual(unified_diff(a, b, 'original/x.py', 'fixed/x.py', algorithm=algorithm), expected)
+        self.assertEqual(unified_diff(a, a), '')
+
+    def test_diff_from_edits(self):
+        a = [f"line {i}\n" for i in range(20)]
+        edits = [(2, 3, ["two\n"]), (10, 12, []), (15, 15, ["inserted\n"])]
+        b = apply_edits(a, edits)
+        self.assertEqual(unified_diff_from_edits(a, edits, 'a', 'b'), ''.join(difflib.unified_diff(a, b, 'a', 'b')))
+
+    def test_output_is_capped(self):
+        a = [f"{i}\n" for i in range(1000)]
+        b = [f"{i}!\n" for i in range(1000)]
+        diff = unified_diff(a, b, max_lines=50)
+        self.assertEqual(diff.count('\n'), 51)
+        self.assertTrue(diff.endswith("... diff truncated after 50 lines\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
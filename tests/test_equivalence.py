@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+import custom_rules
+
+from src.equivalence import (
+    ERROR,
+    FunctionEngine,
+    PoolEngine,
+    compare_engines,
+    ddmin,
+    legacy_check,
+    load_corpus,
+    run_custom_checks_engine,
+)
+
+
+def engine_without_late_semicolons(file_path, source):
+    result = run_custom_checks_engine(file_path, source)
+    if result == ERROR:
+        return result
+    return [violation for violation in result if not (violation[0] == 'CS012' and violation[1] > 5)]
+
+
+class TestEquivalence(unittest.TestCase):
+
+    def test_ddmin_finds_a_minimal_input(self):
+        lines = [f"{number}\n" for number in range(100)]
+        minimal = ddmin(lines, lambda candidate: '17\n' in candidate and '42\n' in candidate)
+        self.assertEqual(minimal, ['17\n', '42\n'])
+
+    def test_engines_match_legacy_rules(self):
+        corpus = load_corpus(synthetic_sizes=(300,))
+        engines = {'run_custom_checks': FunctionEngine(run_custom_checks_engine), 'thread': PoolEngine('thread', 2)}
+        try:
+            comparison = compare_engines(corpus, engines)
+        finally:
+            for engine in engines.values():
+                engine.close()
+        self.assertEqual(comparison['differences'], [])
+        self.assertEqual(set(comparison['timings']), {'legacy', 'run_custom_checks', 'thread'})
+
+    def test_difference_is_reported_with_minimal_reproducer(self):
+        source = ''.join(f"value_{number} = {number};\n" for number in range(40))
+        comparison = compare_engines({'module.py': source}, {'broken': FunctionEngine(engine_without_late_semicolons)})
+        [difference] = comparison['differences']
+        reproducer = difference['reproducer']
+        self.assertEqual(len(reproducer.splitlines()), 6)
+        self.assertNotEqual(engine_without_late_semicolons('module.py', reproducer), legacy_check('module.py', reproducer))
+
+    def test_legacy_rules_do_not_follow_changes_to_the_rules(self):
+        source = "value = 1;\n"
+        with mock.patch.dict(custom_rules.CUSTOM_CHECKS, {'CS012': lambda file_path, source=None: []}):
+            comparison = compare_engines({'module.py': source}, {'run_custom_checks': FunctionEngine(run_custom_checks_engine)})
+        [difference] = comparison['differences']
+        self.assertEqual(difference['reproducer'], source)
+        self.assertIn(('CS012', 1, 10, "Unnecessary semicolon at the end of line 1"), legacy_check('module.py', source))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from src.custom_rules import run_custom_checks
+from src.git_staged import GitCatFileBatch, GitError, list_staged_python_blobs, read_staged_sources
+from src.reports import EXIT_ERROR
+from src.style_checker import main
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+class TestGitStaged(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = tempfile.mkdtemp()
+        git(self.repo, 'init', '-q')
+        os.mkdir(os.path.join(self.repo, 'pkg'))
+        self.write('pkg/module.py', "BadName = 1\n")
+        self.write('notes.txt', "not python\n")
+        git(self.repo, 'add', '.')
+        # The working tree differs from the index; the index must win
+        self.write('pkg/module.py', "good_name = 1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.repo)
+
+    def write(self, path, content):
+        with open(os.path.join(self.repo, path), 'w') as file:
+            file.write(content)
+
+    def test_lists_only_staged_python_files(self):
+        blobs = list_staged_python_blobs(self.repo)
+        self.assertEqual([path for path, _ in blobs], ['pkg/module.py'])
+
+    def test_batch_process_serves_several_blobs(self):
+        (_, object_id), = list_staged_python_blobs(self.repo)
+        with GitCatFileBatch(self.repo) as cat_file:
+            self.assertEqual(cat_file.read_blob(object_id), b"BadName = 1\n")
+            self.assertEqual(cat_file.read_blob(object_id), b"BadName = 1\n")
+            with self.assertRaises(KeyError):
+                cat_file.read_blob('0' * 40)
+
+    def test_staged_sources_are_checked_in_memory(self):
+        sources = read_staged_sources(os.path.join(self.repo, 'pkg'))
+        self.assertEqual(sources, {'module.py': "BadName = 1\n"})
+        violations = run_custom_checks('module.py', codes=['CS001'], source=sources['module.py'])
+        self.assertEqual(len(violations), 1)
+
+    def test_paths_filter_the_staged_files(self):
+        self.write('top.py', "OtherName = 1\n")
+        git(self.repo, 'add', 'top.py')
+        self.assertEqual(sorted(read_staged_sources(self.repo)), [os.path.join('pkg', 'module.py'), 'top.py'])
+        self.assertEqual(list(read_staged_sources(self.repo, paths=['pkg'])), [os.path.join('pkg', 'module.py')])
+        self.assertEqual(list(read_staged_sources(self.repo, paths=['top.py'])), ['top.py'])
+        with self.assertRaises(GitError):
+            read_staged_sources(self.repo, paths=[os.pardir])
+
+    def test_undecodable_blob_is_reported(self):
+        with open(os.path.join(self.repo, 'latin.py'), 'wb') as file:
+            file.write(b'x = "\xff"\n')
+        git(self.repo, 'add', 'latin.py')
+        with self.assertRaises(SyntaxError):
+            read_staged_sources(self.repo)
+        errors = {}
+        self.assertEqual(list(read_staged_sources(self.repo, errors=errors)), [os.path.join('pkg', 'module.py')])
+        self.assertIn('latin.py', errors)
+
+        output = io.StringIO()
+        original_directory = os.getcwd()
+        try:
+            os.chdir(self.repo)
+            with contextlib.redirect_stdout(output):
+                exit_code = main(['--staged'])
+        finally:
+            os.chdir(original_directory)
+        self.assertEqual(exit_code, EXIT_ERROR)
+        self.assertIn("latin.py: read failed: cannot decode", output.getvalue())
+        self.assertIn("pkg/module.py:1:0: CS001", output.getvalue())
+
+    def test_outside_a_repository(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with self.assertRaises(GitError) as context:
+                read_staged_sources(directory)
+            self.assertIn("not a git repository", str(context.exception))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
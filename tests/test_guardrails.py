@@ -0,0 +1,113 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.guardrails import FileSkipped, GuardedExecutor, run_guarded
+from src.parallel_engine import CustomRuleEngine
+
+
+def _spin(seconds):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        pass
+    return 'done'
+
+
+def _recurse(depth):
+    return _recurse(depth + 1)
+
+
+def _square(value):
+    return value * value
+
+
+def _slow_square(value):
+    time.sleep(0.5)
+    return value * value
+
+
+def _kill_worker():
+    os._exit(1)
+
+
+class TestGuardrails(unittest.TestCase):
+
+    def test_wall_time_skips_the_call(self):
+        with self.assertRaises(FileSkipped) as context:
+            run_guarded(0.2, _spin, 5)
+        self.assertIn("took longer than", str(context.exception))
+
+    def test_fast_call_returns_its_result(self):
+        self.assertEqual(run_guarded(5, _spin, 0), 'done')
+
+    def test_deep_recursion_skips_the_call(self):
+        with self.assertRaises(FileSkipped) as context:
+            run_guarded(5, _recurse, 0)
+        self.assertIn("recursion", str(context.exception))
+
+    def test_guarded_executor_returns_results(self):
+        executor = GuardedExecutor(max_workers=2)
+        try:
+            futures = [executor.submit(_square, value) for value in range(4)]
+            self.assertEqual([future.result() for future in futures], [0, 1, 4, 9])
+        finally:
+            executor.shutdown()
+
+    def test_only_the_task_killing_its_worker_is_skipped(self):
+        executor = GuardedExecutor(max_workers=4)
+        try:
+            killer = executor.submit(_kill_worker)
+            bystanders = [executor.submit(_slow_square, value) for value in range(3)]
+            with self.assertRaises(FileSkipped):
+                killer.result(timeout=60)
+            self.assertEqual([future.result(timeout=60) for future in bystanders], [0, 1, 4])
+            self.assertEqual(executor.submit(_square, 5).result(timeout=60), 25)
+        finally:
+            executor.shutdown()
+
+    def test_queued_tasks_go_back_to_the_shared_pool(self):
+        executor = GuardedExecutor(max_workers=2)
+        isolated = []
+        submit_isolated = executor._submit_isolated
+        executor._submit_isolated = lambda outer, function, args: (isolated.append(outer), submit_isolated(outer, function, args))
+        try:
+            killer = executor.submit(_kill_worker)
+            queued = [executor.submit(_slow_square, value) for value in range(8)]
+            with self.assertRaises(FileSkipped):
+                killer.result(timeout=60)
+            self.assertEqual([future.result(timeout=60) for future in queued], [value * value for value in range(8)])
+            self.assertIn(killer, isolated)
+            self.assertLessEqual(len(isolated), executor.max_workers + 1)  # Only the tasks handed to the workers
+        finally:
+            executor.shutdown()
+
+    def test_queued_tasks_can_be_cancelled(self):
+        executor = GuardedExecutor(max_workers=1)
+        try:
+            futures = [executor.submit(_slow_square, value) for value in range(5)]
+            time.sleep(0.2)
+            self.assertFalse(futures[0].cancel())
+            self.assertTrue(futures[-1].cancel())
+            self.assertTrue(futures[-1].cancelled())
+            self.assertEqual(futures[0].result(timeout=60), 0)
+        finally:
+            executor.shutdown()
+
+    def test_engine_reports_skipped_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'module.py')
+            with open(file_path, 'w') as file:
+                file.write("BadName = 1\n")
+            with CustomRuleEngine(max_workers=1, limits={'wall_time': 30}) as engine:
+                result = engine.check_file(file_path)
+            self.assertIsNone(result['skipped'])
+            self.assertTrue(result['custom'])
+            with CustomRuleEngine(max_workers=1, limits={'wall_time': 0.001}) as engine:
+                result = engine.check_file(file_path, source="x = 1\n" * 200000)
+            self.assertIn("took longer than", result['skipped'])
+            self.assertEqual(result['custom'], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from src.flake8_inprocess import run_flake8_inprocess
+from src.lint_server import LintService, make_server
+
+
+SOURCE = "import os\ndef BadName():\n    x=1;\n    return x # noqa: E261\n"
+
+
+def flake8_subprocess(source):
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, 'module.py')
+        with open(file_path, 'w') as file:
+            file.write(source)
+        output = subprocess.run([sys.executable, '-m', 'flake8', '--isolated', file_path], capture_output=True, text=True).stdout
+    return [line.split(':', 1)[1] for line in output.splitlines()]
+
+
+class TestLintServer(unittest.TestCase):
+
+    def setUp(self):
+        self.service = LintService(max_workers=2, mode='thread', queue_size=1)
+        self.server = make_server(self.service, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.close()
+
+    def post(self, payload):
+        request = urllib.request.Request(f"{self.url}/check", data=json.dumps(payload).encode('utf-8'), method='POST')
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_inprocess_flake8_matches_flake8(self):
+        reported = [
+            f"{violation['line_number']}:{violation['column_number']}: {violation['message']}"
+            for violation in run_flake8_inprocess('module.py', SOURCE)
+        ]
+        self.assertEqual(reported, flake8_subprocess(SOURCE))
+
+    def test_batch_is_checked_and_cached(self):
+        payload = {'files': [{'path': 'a.py', 'source': SOURCE}, {'path': 'b.py', 'source': '"""Empty module."""\n'}]}
+        status, body = self.post(payload)
+        self.assertEqual(status, 200)
+        first, second = body['results']
+        self.assertEqual(first['path'], 'a.py')
+        codes = {violation['code'] for violation in first['violations']}
+        self.assertIn('F401', codes)
+        self.assertIn('CS002', codes)
+        self.assertNotIn('E261', codes)
+        self.assertEqual(second['violations'], [])
+        self.assertFalse(first['cached'])
+
+        status, body = self.post({'files': [{'path': 'c.py', 'source': SOURCE}]})
+        self.assertTrue(body['results'][0]['cached'])
+        self.assertEqual(body['results'][0]['violations'], first['violations'])
+        self.assertEqual(self.service.metrics.cache_hits.value(), 1)
+
+    def test_full_queue_is_rejected(self):
+        self.assertTrue(self.service.admit())
+        try:
+            status, body = self.post({'files': [{'path': 'a.py', 'source': SOURCE}]})
+        finally:
+            self.service.release()
+        self.assertEqual(status, 429)
+        self.assertEqual(self.post({'files': []}), (200, {'results': []}))
+
+    def test_malformed_request(self):
+        self.assertEqual(self.post({'files': [{'path': 'a.py'}]})[0], 400)
+
+    def test_invalid_content_length(self):
+        for header, status in (('Content-Length: abc\r\n', b' 400 '), ('Content-Length: -1\r\n', b' 400 '), ('', b' 411 ')):
+            with socket.create_connection(self.server.server_address, timeout=10) as connection:
+                connection.sendall(f"POST /check HTTP/1.1\r\nHost: localhost\r\n{header}\r\n".encode('ascii'))
+                self.assertIn(status, connection.recv(1024).split(b'\r\n')[0] + b' ')
+
+    def test_slow_files_time_out(self):
+        self.service.timeout = 0
+        [result] = self.service.check_batch([{'path': 'big.py', 'source': "value = 1\n" * 20000}])
+        self.assertEqual(result['errors'], {'check': "timed out after 0 seconds"})
+        self.assertEqual(len(self.service.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
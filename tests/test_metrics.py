@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from src.metrics import CheckerMetrics, MetricsRegistry, TraceRecorder, start_metrics_server, write_metrics_file
+
+
+def result(file_path, start):
+    return {
+        'file_path': file_path,
+        'merged': [{'line_number': 1, 'column_number': 0, 'code': 'CS001', 'message': ''}],
+        'timings': {'total': 0.3, 'custom': 0.2, 'flake8': 0.3},
+        'rule_timings': {'CS001': 0.002},
+        'errors': {},
+        'skipped': None,
+        'spans': [('custom', start, 0.2), ('flake8', start, 0.3)],
+    }
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_prometheus_text(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('checks_total', "Checks.", ['code'])
+        histogram = registry.histogram('latency_seconds', "Latency.", buckets=(0.1, 1))
+        counter.inc(code='E"1')
+        histogram.observe(0.5)
+        text = registry.render()
+        self.assertIn('# TYPE checks_total counter', text)
+        self.assertIn('checks_total{code="E\\"1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 0', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn('latency_seconds_count 1', text)
+
+    def test_checker_metrics_from_results(self):
+        metrics = CheckerMetrics()
+        metrics.observe_result(result('a.py', 0.0))
+        self.assertEqual(metrics.files_checked.value(), 1)
+        self.assertEqual(metrics.violations.value(code='CS001'), 1)
+        self.assertEqual(metrics.tool_duration.value(tool='flake8')[2], 1)
+        self.assertIsNone(metrics.tool_duration.value(tool='total'))
+
+    def test_metrics_file_and_endpoint(self):
+        metrics = CheckerMetrics()
+        metrics.observe_result(result('a.py', 0.0))
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'metrics.prom')
+            write_metrics_file(file_path, metrics.registry)
+            with open(file_path) as file:
+                self.assertIn('style_checker_files_checked_total 1', file.read())
+        server = start_metrics_server(metrics.registry, 0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+                self.assertIn(b'style_checker_files_checked_total 1', response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_trace_spans_do_not_overlap_on_a_lane(self):
+        trace = TraceRecorder()
+        trace.add_result(result('a.py', 0.0))
+        trace.add_result(result('b.py', 0.1))
+        events = trace.trace_events()
+        self.assertEqual(len(events), 6)
+        lanes = {}
+        for event in events:
+            lanes.setdefault(event['tid'], []).append((event['ts'], event['ts'] + event['dur']))
+        for spans in lanes.values():
+            for (_, end), (start, _) in zip(spans, spans[1:]):
+                self.assertLessEqual(end, start)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'trace.json')
+            trace.write(file_path)
+            with open(file_path) as file:
+                self.assertEqual(len(json.load(file)['traceEvents']), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
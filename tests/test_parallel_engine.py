@@ -0,0 +1,39 @@
+import unittest
+
+from src.parallel_engine import CustomRuleEngine, is_free_threaded, resolve_mode
+
+SOURCES = {
+    'first.py': "BadName = 1\n",
+    'second.py': "def BadFunction():\n    pass\n",
+    'broken.py': "def broken(:\n",
+}
+
+
+class TestParallelEngine(unittest.TestCase):
+
+    def test_auto_mode_follows_the_build(self):
+        expected = 'thread' if is_free_threaded() else 'process'
+        self.assertEqual(resolve_mode('auto'), expected)
+        with self.assertRaises(ValueError):
+            resolve_mode('fibers')
+
+    def test_threads_and_processes_agree(self):
+        file_paths = sorted(SOURCES)
+        with CustomRuleEngine(2, 'thread') as engine:
+            thread_results = engine.check_files(file_paths, sources=SOURCES)
+        with CustomRuleEngine(2, 'process') as engine:
+            process_results = engine.check_files(file_paths, sources=SOURCES)
+        for result in thread_results + process_results:
+            result.pop('rule_timings')
+        self.assertEqual(thread_results, process_results)
+
+    def test_errors_are_reported_per_file(self):
+        with CustomRuleEngine(2, 'thread') as engine:
+            broken, first = engine.check_files(['broken.py', 'first.py'], sources=SOURCES)
+        self.assertIn('custom', broken['errors'])
+        self.assertEqual(first['errors'], {})
+        self.assertTrue(first['custom'])
+
+
+if __name__ == "__main__":
+    unittest.main()
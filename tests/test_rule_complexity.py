@@ -0,0 +1,113 @@
+import math
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from src.custom_rules import CUSTOM_CHECKS
+from src.synthetic_corpus import generate_module
+
+# Module sizes whose executed Python lines, calls and returns are counted for every rule
+COUNTED_SIZES = [500, 1000, 2000, 4000]
+
+# Largest growth exponent of the counts accepted as linear (the counts are exact)
+MAX_COUNT_EXPONENT = 1.15
+
+# Largest module size in lines for the timing run; set it (e.g. to 64000) to time the rules as well
+MAX_LINES = int(os.environ.get('STYLE_CHECKER_COMPLEXITY_MAX_LINES', 0))
+
+# Module sizes timed for every rule, doubling up to MAX_LINES
+SIZES = [MAX_LINES >> shift for shift in (3, 2, 1, 0)]
+
+# Largest growth exponent of the timings accepted as linear (timings are noisy)
+MAX_EXPONENT = 1.4
+
+# Each size is timed this many times and the fastest run is kept
+REPEATS = 3
+
+
+def growth_exponent(sizes, timings):
+    """Fit time = c * size ** k by least squares on a log-log scale and return k."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(timing, 1e-9)) for timing in timings]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+
+def count_trace_events(function, *args):
+    """Return the number of Python trace events (calls, lines, returns) a call produces."""
+    events = 0
+
+    def trace(frame, event, arg):
+        nonlocal events
+        events += 1
+        return trace
+
+    previous_trace = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        function(*args)
+    finally:
+        sys.settrace(previous_trace)
+    return events
+
+
+class TestRuleComplexity(unittest.TestCase):
+
+    def test_growth_exponent_fit(self):
+        sizes = [1000, 2000, 4000]
+        self.assertAlmostEqual(growth_exponent(sizes, [0.1, 0.2, 0.4]), 1.0)
+        self.assertAlmostEqual(growth_exponent(sizes, [0.1, 0.4, 1.6]), 2.0)
+
+    def test_trace_events_detect_nested_loops(self):
+        def pairwise(file_path, source):
+            lines = source.splitlines()
+            return sum(1 for first in lines[::10] for second in lines[::10] if first == second)
+
+        counts = [count_trace_events(pairwise, 'module.py', generate_module(size)) for size in COUNTED_SIZES]
+        self.assertGreater(growth_exponent(COUNTED_SIZES, counts), MAX_COUNT_EXPONENT)
+
+    def test_rules_scale_linearly(self):
+        """Executed Python code per input line must not grow with the module (deterministic)."""
+        sources = [generate_module(size) for size in COUNTED_SIZES]
+        for code, check in CUSTOM_CHECKS.items():
+            with self.subTest(rule=code, check=check.__name__):
+                counts = [count_trace_events(check, 'module.py', source) for source in sources]
+                exponent = growth_exponent(COUNTED_SIZES, counts)
+                self.assertLessEqual(
+                    exponent, MAX_COUNT_EXPONENT,
+                    f"{check.__name__} runs n^{exponent:.2f} Python trace events over {COUNTED_SIZES} lines: {counts}",
+                )
+
+    @unittest.skipUnless(MAX_LINES, "set STYLE_CHECKER_COMPLEXITY_MAX_LINES to time the rules")
+    def test_rule_timings_scale_linearly(self):
+        """Also catches growth inside C code, which the trace events do not see."""
+        with tempfile.TemporaryDirectory() as directory:
+            file_paths = []
+            for size in SIZES:
+                file_path = os.path.join(directory, f"synthetic_{size}.py")
+                with open(file_path, 'w') as file:
+                    file.write(generate_module(size))
+                file_paths.append(file_path)
+            for code, check in CUSTOM_CHECKS.items():
+                with self.subTest(rule=code, check=check.__name__):
+                    timings = []
+                    for file_path in file_paths:
+                        best = float('inf')
+                        for _ in range(REPEATS):
+                            start_time = time.perf_counter()
+                            check(file_path)
+                            best = min(best, time.perf_counter() - start_time)
+                        timings.append(best)
+                    exponent = growth_exponent(SIZES, timings)
+                    self.assertLessEqual(
+                        exponent, MAX_EXPONENT,
+                        f"{check.__name__} grows like n^{exponent:.2f} over {SIZES} lines: {timings}",
+                    )
+
+if __name__ == "__main__":
+    unittest.main()
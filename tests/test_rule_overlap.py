@@ -0,0 +1,37 @@
+import unittest
+
+from src.rule_overlap import CUSTOM_TO_FLAKE8, merge_violations, plan_checks
+
+
+class TestRuleOverlap(unittest.TestCase):
+
+    def test_plan_prefers_flake8_for_overlapping_rules(self):
+        plan = plan_checks(('custom', 'flake8'), prefer='flake8')
+        for code in CUSTOM_TO_FLAKE8:
+            self.assertNotIn(code, plan['custom_codes'])
+        self.assertEqual(plan['flake8_extend_ignore'], [])
+
+    def test_plan_prefers_custom_ignores_flake8_codes(self):
+        plan = plan_checks(('custom', 'flake8'), prefer='custom')
+        self.assertIn('CS007', plan['custom_codes'])
+        self.assertIn('E501', plan['flake8_extend_ignore'])
+
+    def test_single_engine_keeps_every_check(self):
+        plan = plan_checks(('custom',))
+        self.assertIn('CS007', plan['custom_codes'])
+
+    def test_merge_drops_cross_engine_duplicates(self):
+        custom = [
+            {'line_number': 3, 'column_number': 0, 'code': 'CS007', 'message': 'Line 3 exceeds 79 characters'},
+            {'line_number': 1, 'column_number': 0, 'code': 'CS001', 'message': "Variable 'X' should be snake_case"},
+        ]
+        flake8 = [
+            {'line_number': 3, 'column_number': 80, 'code': 'E501', 'message': 'E501 line too long (90 > 79 characters)'},
+            {'line_number': 2, 'column_number': 1, 'code': 'E225', 'message': 'E225 missing whitespace around operator'},
+        ]
+        merged = merge_violations(custom, flake8)
+        self.assertEqual([v['code'] for v in merged], ['CS001', 'E225', 'CS007'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.async_runner import run_checks_concurrently
+from src.run_history import RunHistory, order_by_cost
+
+
+def result(file_path, elapsed, codes):
+    return {
+        'file_path': file_path,
+        'merged': [{'line_number': 1, 'column_number': 0, 'code': code, 'message': ''} for code in codes],
+        'timings': {'total': elapsed, 'custom': elapsed, 'flake8': elapsed},
+        'rule_timings': {'CS001': elapsed / 2},
+    }
+
+
+class TestRunHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.history = RunHistory(':memory:')
+
+    def tearDown(self):
+        self.history.close()
+
+    def test_slowest_files_and_costs(self):
+        self.history.record_run([result('a.py', 0.1, []), result('b.py', 0.5, [])], {'python': '3'})
+        self.assertEqual(self.history.slowest_files(1)[0][0], 'b.py')
+        self.assertEqual(order_by_cost(['a.py', 'c.py', 'b.py'], self.history.file_costs()), ['b.py', 'a.py', 'c.py'])
+
+    def test_growing_rules_compares_last_two_runs(self):
+        self.history.record_run([result('a.py', 0.1, ['CS001'])], {})
+        self.history.record_run([result('a.py', 0.1, ['CS001', 'CS001', 'E225'])], {})
+        growing = self.history.growing_rules()
+        self.assertEqual(growing[0], ('CS001', 1, 2))
+        self.assertIn(('E225', 0, 1), growing)
+
+    def test_growing_rules_ignore_files_missing_from_either_run(self):
+        self.history.record_run([result('a.py', 0.1, ['CS001']), result('b.py', 0.1, ['CS001'])], {})
+        self.history.record_run([result('a.py', 0.1, ['CS001']), result('c.py', 0.1, ['CS001', 'CS001'])], {})
+        self.assertEqual(self.history.growing_rules(), [])
+        self.history.record_run([result('a.py', 0.1, ['CS001', 'CS002']), result('b.py', 0.1, ['CS001', 'CS001'])], {})
+        self.assertEqual(self.history.growing_rules(), [('CS002', 0, 1)])
+
+    def test_queued_files_are_not_charged_for_waiting(self):
+        async def slow_flake8(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return []
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_paths = []
+            for number in range(6):
+                file_paths.append(os.path.join(directory, f"module_{number}.py"))
+                with open(file_paths[-1], 'w') as file:
+                    file.write("value = 1\n")
+            with mock.patch('src.async_runner.run_flake8_async', slow_flake8):
+                results = run_checks_concurrently(file_paths, max_concurrency=1, tools=('custom', 'flake8'))
+        self.history.record_run(results, {})
+        costs = list(self.history.file_costs().values())
+        self.assertEqual(len(costs), 6)
+        self.assertGreaterEqual(min(costs), 0.05)
+        self.assertLess(max(costs) - min(costs), 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from src.reports import EXIT_ERROR, EXIT_VIOLATIONS, build_report, merge_reports
+from src.sharding import parse_shard_spec, partition_files
+
+
+class TestSharding(unittest.TestCase):
+
+    def test_parse_shard_spec(self):
+        self.assertEqual(parse_shard_spec('2/4'), (2, 4))
+        with self.assertRaises(ValueError):
+            parse_shard_spec('5/4')
+        with self.assertRaises(ValueError):
+            parse_shard_spec('two')
+
+    def test_partition_balances_by_cost(self):
+        costs = {'big.py': 10.0, 'a.py': 4.0, 'b.py': 3.0, 'c.py': 3.0}
+        shards = partition_files(list(costs), 2, costs)
+        self.assertEqual(shards, [['big.py'], ['a.py', 'b.py', 'c.py']])
+        self.assertEqual(shards, partition_files(sorted(costs, reverse=True), 2, costs))
+
+    def test_merge_combines_shards(self):
+        violation = {'line_number': 1, 'column_number': 0, 'code': 'CS001', 'message': 'message'}
+        first = build_report([{'file_path': 'a.py', 'violations': [violation], 'errors': {}}], EXIT_VIOLATIONS, '1/2')
+        second = build_report([{'file_path': 'b.py', 'violations': [], 'errors': {}}], 0, '2/2')
+        merged = merge_reports([first, second])
+        self.assertEqual([f['file_path'] for f in merged['files']], ['a.py', 'b.py'])
+        self.assertEqual(merged['violation_count'], 1)
+        self.assertEqual(merged['exit_code'], EXIT_VIOLATIONS)
+
+    def test_merge_with_missing_shard_is_an_error(self):
+        report = build_report([], 0, '1/2')
+        self.assertEqual(merge_reports([report])['exit_code'], EXIT_ERROR)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from src.custom_rules import run_custom_checks
+from src.suppression import build_suppression_index
+
+SOURCE = '''import os  # noqa: CS015
+BadName = 1  # noqa
+OtherName = 2  # style: ignore[CS016]
+text = "# noqa inside a string is not a comment"
+# style: disable[CS001]
+ThirdName = 3
+# style: enable[CS001]
+FourthName = 4
+'''
+
+
+class TestSuppression(unittest.TestCase):
+
+    def setUp(self):
+        self.index = build_suppression_index(SOURCE)
+
+    def test_line_comments(self):
+        self.assertTrue(self.index.is_suppressed(1, 'CS015'))
+        self.assertFalse(self.index.is_suppressed(1, 'CS001'))
+        self.assertTrue(self.index.is_suppressed(2, 'CS001'))
+        self.assertTrue(self.index.is_suppressed(3, 'CS016'))
+        self.assertFalse(self.index.is_suppressed(4, 'CS016'))
+
+    def test_codes_apply_to_both_engines(self):
+        self.assertTrue(self.index.is_suppressed(1, 'F401'))
+
+    def test_block_comments(self):
+        self.assertTrue(self.index.is_suppressed(6, 'CS001'))
+        self.assertFalse(self.index.is_suppressed(8, 'CS001'))
+        self.assertFalse(self.index.is_rule_fully_suppressed('CS001'))
+
+    def test_whole_file_block_skips_rule(self):
+        index = build_suppression_index("# style: disable[CS001]\nBadName = 1\n")
+        self.assertTrue(index.is_rule_fully_suppressed('CS001'))
+        self.assertFalse(index.is_rule_fully_suppressed('CS016'))
+
+    def test_custom_checks_drop_suppressed_violations(self):
+        violations = run_custom_checks('module.py', codes=['CS001'], source=SOURCE, suppressions=self.index)
+        self.assertEqual([v['line_number'] for v in violations], [3, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from src.symbol_index import SymbolIndex, apply_renames, plan_references, rename_references, rename_tokens, walk_python_files
+
+DEFINING_MODULE = '''def ComputeTotal(values):
+    return sum(values)
+
+MaxSize = 10
+'''
+
+IMPORTING_MODULES = {
+    'bare.py': 'from pkg.mod import ComputeTotal\n\nx = ComputeTotal([1])  # ComputeTotal\ny = "ComputeTotal"\nz = other.ComputeTotal\n',
+    'aliased.py': 'from pkg.mod import MaxSize as limit\n\nx = limit\n',
+    'attribute.py': 'import pkg.mod\nfrom pkg import mod as m\n\nx = pkg.mod.ComputeTotal([1]) + m.MaxSize\n',
+    'unrelated.py': 'ComputeTotal = 1\n',
+}
+
+
+class TestSymbolIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        os.mkdir(os.path.join(self.root, 'pkg'))
+        self.write(os.path.join('pkg', '__init__.py'), '')
+        self.write(os.path.join('pkg', 'mod.py'), DEFINING_MODULE)
+        for file_name, source in IMPORTING_MODULES.items():
+            self.write(file_name, source)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, relative_path, source):
+        with open(os.path.join(self.root, relative_path), 'w') as file:
+            file.write(source)
+
+    def read(self, relative_path):
+        with open(os.path.join(self.root, relative_path)) as file:
+            return file.read()
+
+    def test_update_only_parses_changed_files(self):
+        index = SymbolIndex(self.root)
+        self.assertEqual(index.update(), 6)
+        index.save()
+        reloaded = SymbolIndex(self.root)
+        self.assertEqual(reloaded.update(), 0)
+        self.write('bare.py', IMPORTING_MODULES['bare.py'] + 'w = 1\n')
+        self.assertEqual(reloaded.update(), 1)
+        os.remove(os.path.join(self.root, 'unrelated.py'))
+        reloaded.update()
+        self.assertNotIn('unrelated.py', reloaded.entries)
+
+    def git(self, *args):
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args], cwd=self.root, check=True, capture_output=True)
+
+    def test_environments_and_build_output_are_skipped(self):
+        for directory in ('venv', 'build', 'myenv'):
+            os.mkdir(os.path.join(self.root, directory))
+            self.write(os.path.join(directory, 'installed.py'), 'ComputeTotal = 1\n')
+        self.write(os.path.join('myenv', 'pyvenv.cfg'), 'home = /usr/bin\n')
+        os.mkdir(os.path.join(self.root, '.hidden'))
+        self.write(os.path.join('.hidden', 'secret.py'), '')
+        project = {'bare.py', 'aliased.py', 'attribute.py', 'unrelated.py', os.path.join('pkg', '__init__.py'), os.path.join('pkg', 'mod.py')}
+        found = {os.path.relpath(path, self.root) for path in walk_python_files(self.root, skip_environments=True)}
+        self.assertEqual(found, project)
+        found = {os.path.relpath(path, self.root) for path in walk_python_files(self.root)}
+        self.assertEqual(found, project | {os.path.join(directory, 'installed.py') for directory in ('venv', 'build', 'myenv')})
+
+    def test_refresh_only_reads_files_changed_in_git(self):
+        self.git('init', '-q')
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', 'initial')
+        os.mkdir(os.path.join(self.root, 'venv'))
+        self.write(os.path.join('venv', 'installed.py'), 'from pkg.mod import ComputeTotal\n')
+        index = SymbolIndex(self.root)
+        self.assertEqual(index.refresh(), 6)
+        index.save()
+
+        self.write('bare.py', IMPORTING_MODULES['bare.py'] + 'w = 1\n')
+        self.write('new.py', 'from pkg.mod import MaxSize\n')
+        reloaded = SymbolIndex(self.root)
+        with mock.patch.object(reloaded, '_update_file', wraps=reloaded._update_file) as update_file:
+            self.assertEqual(reloaded.refresh(), 2)
+        self.assertEqual(sorted(call.args[0] for call in update_file.call_args_list), ['bare.py', 'new.py'])
+        self.assertNotIn(os.path.join('venv', 'installed.py'), reloaded.entries)
+
+        self.write('bare.py', IMPORTING_MODULES['bare.py'])
+        with mock.patch.object(reloaded, '_update_file', wraps=reloaded._update_file) as update_file:
+            self.assertEqual(reloaded.refresh(), 1)
+        self.assertEqual(sorted(call.args[0] for call in update_file.call_args_list), ['bare.py', 'new.py'])
+
+    def test_references_follow_imports(self):
+        index = SymbolIndex(self.root)
+        index.update()
+        references = index.references(os.path.join(self.root, 'pkg', 'mod.py'), ['ComputeTotal', 'MaxSize'])
+        self.assertEqual(sorted(references), ['aliased.py', 'attribute.py', 'bare.py'])
+        self.assertEqual(references['bare.py'][0], {'ComputeTotal'})
+        self.assertEqual(references['aliased.py'][1], {'MaxSize'})
+        self.assertIn(('m', 'MaxSize'), references['attribute.py'][2])
+
+    def test_rename_tokens_leaves_strings_comments_and_other_attributes(self):
+        renamed = rename_tokens(IMPORTING_MODULES['bare.py'], {'ComputeTotal': 'compute_total'}, bare={'ComputeTotal'})
+        self.assertEqual(renamed, IMPORTING_MODULES['bare.py'].replace('import ComputeTotal', 'import compute_total').replace('x = ComputeTotal(', 'x = compute_total('))
+
+    def test_rename_references_across_project(self):
+        renames = {'ComputeTotal': 'compute_total', 'MaxSize': 'max_size'}
+        updated = rename_references(os.path.join(self.root, 'pkg', 'mod.py'), renames, root=self.root)
+        self.assertEqual([os.path.basename(path) for path in updated], ['aliased.py', 'attribute.py', 'bare.py'])
+        self.assertEqual(self.read('aliased.py'), 'from pkg.mod import max_size as limit\n\nx = limit\n')
+        self.assertIn('pkg.mod.compute_total([1]) + m.max_size', self.read('attribute.py'))
+        self.assertEqual(self.read('unrelated.py'), IMPORTING_MODULES['unrelated.py'])
+
+    def test_planned_renames_are_written_only_when_applied(self):
+        file_path = os.path.join(self.root, 'pkg', 'mod.py')
+        planned = plan_references(file_path, {'MaxSize': 'max_size'}, root=self.root)
+        self.assertEqual([os.path.basename(path) for path in planned], ['aliased.py', 'attribute.py'])
+        self.assertEqual(self.read('aliased.py'), IMPORTING_MODULES['aliased.py'])
+        os.chmod(os.path.join(self.root, 'aliased.py'), 0o640)
+
+        apply_renames(file_path, planned, root=self.root)
+        self.assertEqual(self.read('aliased.py'), 'from pkg.mod import max_size as limit\n\nx = limit\n')
+        self.assertEqual(os.stat(os.path.join(self.root, 'aliased.py')).st_mode & 0o777, 0o640)
+        self.assertFalse([name for name in os.listdir(self.root) if name.endswith('.tmp')])
+
+
+if __name__ == "__main__":
+    unittest.main()